@@ -0,0 +1,69 @@
+"""
+Peak Python memory to store and read back one binary vault item, from
+1 KB up, through the streamed blob path the /api/vault/{name}/raw
+endpoints use. The item arrives in 64 KB request-body pieces and is read
+back chunk by chunk, so the peak should not grow with the item size.
+
+    python -m benchmarks.bench_blob_memory [size_mb ...]
+"""
+
+import io
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+from hashfi.core.session import SessionManager
+
+PIECE = 64 * 1024  # Typical ASGI request body message
+
+
+def measure(session: SessionManager, size: int):
+    piece = os.urandom(min(size, PIECE))
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+
+    blob = session.open_blob("item")
+    remaining = size
+    while remaining:
+        n = min(remaining, len(piece))
+        blob.write(piece[:n])
+        remaining -= n
+    blob.commit()
+    stored = time.perf_counter()
+    _, store_peak = tracemalloc.get_traced_memory()
+
+    tracemalloc.reset_peak()
+    received = sum(len(chunk) for chunk in session.iter_blob("item"))
+    read = time.perf_counter()
+    _, read_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert received == size
+    return store_peak, read_peak, stored - start, read - stored
+
+
+def main():
+    sizes = [1024, 1 << 20, 64 << 20, 512 << 20]
+    if len(sys.argv) > 1:
+        sizes = [int(float(mb) * (1 << 20)) for mb in sys.argv[1:]]
+    for storage in ("directory", "segment"):
+        session = SessionManager(storage=storage)
+        with redirect_stdout(io.StringIO()):
+            session.start_session()
+        print(f"{storage}:")
+        for size in sizes:
+            store_peak, read_peak, store_s, read_s = measure(session, size)
+            print(
+                f"  {size / 1024:10.0f} KB  peak store {store_peak / 1024:6.0f} KB"
+                f"  read {read_peak / 1024:6.0f} KB"
+                f"  ({size / (1 << 20) / store_s:6.0f} / "
+                f"{size / (1 << 20) / read_s:6.0f} MB/s)"
+            )
+        with redirect_stdout(io.StringIO()):
+            session.burn_session()
+
+
+if __name__ == "__main__":
+    main()
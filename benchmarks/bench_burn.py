@@ -0,0 +1,80 @@
+"""
+Measures breach-to-key-dropped and breach-to-disk-clean times across vault
+sizes, for the old single-phase burn (key dropped, then a sequential
+rmtree before the session is marked inactive) and the two-phase burn.
+
+    python -m benchmarks.bench_burn [sizes...]
+"""
+
+import io
+import os
+import shutil
+import sys
+import time
+from contextlib import redirect_stdout
+
+from hashfi.core.session import SessionManager
+
+
+def make_session(count: int, **options) -> SessionManager:
+    session = SessionManager(**options)
+    with redirect_stdout(io.StringIO()):
+        session.start_session()
+    session.store_secrets((f"secret{i:06d}", "x" * 512) for i in range(count))
+    return session
+
+
+def legacy_burn(session: SessionManager):
+    # What burn_session used to do, inline in the breach callback.
+    session.vault_key = None
+    session._cipher = None
+    shutil.rmtree(session.sandbox_path)
+    session.is_active = False
+
+
+def run_legacy(count: int):
+    session = make_session(count)
+    sandbox = session.sandbox_path
+    start = time.perf_counter()
+    legacy_burn(session)
+    invalidated = time.perf_counter() - start
+    assert not os.path.exists(sandbox)
+    # The session only becomes inactive once the disk is clean.
+    return invalidated, invalidated
+
+
+def run_two_phase(count: int, **options):
+    session = make_session(count, **options)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        session.burn_session(wait=False)
+        invalidated = time.perf_counter() - start
+        session.teardown_done.wait()
+    clean = time.perf_counter() - start
+    return invalidated, clean
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1:]] or [1000, 10000, 50000]
+    cases = (
+        ("legacy rmtree", run_legacy, {}),
+        ("two-phase", run_two_phase, {}),
+        ("two-phase shred", run_two_phase, {"shred_passes": 1}),
+        (
+            "shred, 0.5s budget",
+            run_two_phase,
+            {"shred_passes": 1, "teardown_budget": 0.5},
+        ),
+    )
+    for count in sizes:
+        print(f"{count} secrets")
+        for label, fn, options in cases:
+            invalidated, clean = fn(count, **options)
+            print(
+                f"  {label:20s} key dropped {invalidated * 1000:9.2f} ms"
+                f"  disk clean {clean * 1000:9.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Encrypt and decrypt throughput of each vault cipher backend over a range
+of secret sizes, plus the bytes each record adds on top of the plaintext.
+
+    python -m benchmarks.bench_ciphers [seconds_per_case]
+"""
+
+import os
+import sys
+import time
+
+from hashfi.utils.ciphers import VaultCipher
+
+SIZES = (64, 1024, 16 * 1024, 256 * 1024, 4 * 1024 * 1024)
+BACKENDS = ("fernet", "aes-gcm", "chacha20")
+
+
+def throughput(fn, arg, size: int, seconds: float) -> float:
+    """MB/s of fn(arg), repeated for about `seconds`."""
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        fn(arg)
+        count += 1
+        now = time.perf_counter()
+        if now >= deadline:
+            return count * size / (now - start) / 1e6
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 0.3
+    key = os.urandom(32)
+    print(
+        f"{'backend':9s} {'size':>8s} {'overhead':>9s} {'enc MB/s':>9s} {'dec MB/s':>9s}"
+    )
+    for backend in BACKENDS:
+        cipher = VaultCipher(key, backend)
+        for size in SIZES:
+            plaintext = os.urandom(size)
+            record = cipher.encrypt(plaintext)
+            assert cipher.decrypt(record) == plaintext
+            enc = throughput(cipher.encrypt, plaintext, size, seconds)
+            dec = throughput(cipher.decrypt, record, size, seconds)
+            overhead = len(record) - size
+            print(f"{backend:9s} {size:8d} {overhead:9d} {enc:9.1f} {dec:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
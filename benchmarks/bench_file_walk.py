@@ -0,0 +1,74 @@
+"""
+Compares the legacy os.walk integrity scan against the pruned scandir walker
+on a synthetic project tree containing a large virtualenv.
+
+    python -m benchmarks.bench_file_walk [venv_files] [project_files]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from hashfi.utils.ignore import IgnoreRules, DEFAULT_IGNORE_PATTERNS, walk_files
+
+
+def build_tree(root: str, venv_files: int, project_files: int):
+    for i in range(venv_files):
+        d = os.path.join(root, ".venv", "lib", "site-packages", f"pkg{i // 100}")
+        os.makedirs(d, exist_ok=True)
+        open(os.path.join(d, f"mod{i}.py"), "w").close()
+    for i in range(project_files):
+        d = os.path.join(root, "src", f"pkg{i // 50}")
+        os.makedirs(os.path.join(d, "__pycache__"), exist_ok=True)
+        open(os.path.join(d, f"mod{i}.py"), "w").close()
+        open(os.path.join(d, "__pycache__", f"mod{i}.pyc"), "w").close()
+
+
+def legacy_walk(root: str) -> int:
+    count = 0
+    for dirpath, _, files in os.walk(root):
+        if "__pycache__" in dirpath or ".git" in dirpath or ".venv" in dirpath:
+            continue
+        for file in files:
+            if file.endswith(".pyc"):
+                continue
+            os.path.getmtime(os.path.join(dirpath, file))
+            count += 1
+    return count
+
+
+def pruned_walk(root: str, rules: IgnoreRules) -> int:
+    return sum(1 for _ in walk_files(root, rules))
+
+
+def best_of(fn, *args, repeat: int = 5):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    venv_files = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    project_files = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    root = tempfile.mkdtemp(prefix="hashfi_bench_")
+    try:
+        build_tree(root, venv_files, project_files)
+        rules = IgnoreRules(DEFAULT_IGNORE_PATTERNS)
+        legacy, n_legacy = best_of(legacy_walk, root)
+        pruned, n_pruned = best_of(pruned_walk, root, rules)
+        assert n_legacy == n_pruned, (n_legacy, n_pruned)
+        print(f"tree: {venv_files} venv files, {project_files} project files")
+        print(f"legacy os.walk : {legacy * 1000:8.1f} ms ({n_legacy} files)")
+        print(f"pruned scandir : {pruned * 1000:8.1f} ms ({n_pruned} files)")
+        print(f"speedup        : {legacy / pruned:8.1f}x")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
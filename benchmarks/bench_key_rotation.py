@@ -0,0 +1,100 @@
+"""
+Rotates the key of a 100k-secret vault with 1, 2, 4, ... worker threads
+(up to the core count) and reports the rotation time for each. For the
+widest pool it also times single-secret reads and writes from another
+thread while the rotation runs, against the same calls on an idle vault.
+
+    python -m benchmarks.bench_key_rotation [secrets]
+"""
+
+import io
+import os
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+
+from hashfi.core.session import SessionManager
+
+
+def started_session(count: int) -> SessionManager:
+    session = SessionManager(storage="segment")
+    with redirect_stdout(io.StringIO()):
+        session.start_session()
+    session.store_secrets(
+        (f"secret_{i:06d}", os.urandom(24).hex()) for i in range(count)
+    )
+    return session
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def traffic(session: SessionManager, count: int, stop: threading.Event):
+    """Alternating reads and writes; returns per-call latencies in ms."""
+    latencies = []
+    i = 0
+    while not stop.is_set():
+        name = f"secret_{(i * 7919) % count:06d}"
+        start = time.perf_counter()
+        if i % 2:
+            session.store_secret(name, "updated")
+        else:
+            assert session.retrieve_secret(name) is not None
+        latencies.append((time.perf_counter() - start) * 1000)
+        i += 1
+        time.sleep(0.001)
+    return latencies
+
+
+def measured_traffic(session: SessionManager, count: int, during):
+    stop = threading.Event()
+    result = []
+    thread = threading.Thread(
+        target=lambda: result.extend(traffic(session, count, stop)), daemon=True
+    )
+    thread.start()
+    during()
+    stop.set()
+    thread.join()
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    cores = os.cpu_count() or 1
+    widths = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+    print(f"{count} secrets, {cores} cores")
+    for workers in widths:
+        session = started_session(count)
+        with redirect_stdout(io.StringIO()):
+            progress = session.rotate_key(workers=workers)
+        print(
+            f"  {workers:2d} workers  {progress.seconds:6.2f} s"
+            f"  ({progress.rotated / progress.seconds:8.0f} records/s)"
+        )
+        with redirect_stdout(io.StringIO()):
+            session.burn_session()
+
+    session = started_session(count)
+    idle = measured_traffic(session, count, lambda: time.sleep(2))
+    with redirect_stdout(io.StringIO()):
+        busy = measured_traffic(
+            session, count, lambda: session.rotate_key(workers=widths[-1])
+        )
+    for label, samples in (("idle vault", idle), ("during rotation", busy)):
+        print(
+            f"  {label:16s} {len(samples):5d} calls"
+            f"  p50 {percentile(samples, 0.5):6.2f} ms"
+            f"  p99 {percentile(samples, 0.99):6.2f} ms"
+            f"  max {max(samples):6.2f} ms"
+        )
+    assert session.key_id == 1 and session._cipher.key_ids == [1]
+    with redirect_stdout(io.StringIO()):
+        session.burn_session()
+
+
+if __name__ == "__main__":
+    main()
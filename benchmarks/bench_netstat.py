@@ -0,0 +1,60 @@
+"""
+Compares the /proc/net state counter with psutil.net_connections at large
+socket counts. Opens N listening TCP sockets and N connected UDP sockets.
+
+    python -m benchmarks.bench_netstat [sockets]
+"""
+
+import resource
+import socket
+import sys
+import time
+
+import psutil
+
+from hashfi.utils.netstat import count_connections
+
+
+def open_sockets(n: int):
+    socks = []
+    for _ in range(n):
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.bind(("127.0.0.1", 0))
+        s.listen(1)
+        socks.append(s)
+        u = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        u.connect(s.getsockname())
+        socks.append(u)
+    return socks
+
+
+def best_of(fn, repeat: int = 5):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    n = min(n, (hard - 100) // 2)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    socks = open_sockets(n)
+    try:
+        t_proc, counts = best_of(count_connections)
+        t_psutil, conns = best_of(lambda: psutil.net_connections(kind="inet"))
+        print(f"{2 * n} extra sockets")
+        print(f"/proc counter : {t_proc * 1000:8.2f} ms  total {counts.total}")
+        print(f"psutil        : {t_psutil * 1000:8.2f} ms  total {len(conns)}")
+        print(f"speedup       : {t_psutil / t_proc:8.1f}x")
+        print(f"states        : {counts.by_state()}")
+    finally:
+        for s in socks:
+            s.close()
+
+
+if __name__ == "__main__":
+    main()
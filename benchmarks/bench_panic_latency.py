@@ -0,0 +1,105 @@
+"""
+Measures the time from a panic keypress or SIGUSR1 to burn_session
+completing, for the push path and for the old poll-only loop. Exits with
+an error if any push-path trial takes longer than PUSH_BUDGET_MS: a pushed
+panic has to land well inside one 100 ms poll cycle, not after it.
+
+    python -m benchmarks.bench_panic_latency [trials]
+"""
+
+import io
+import os
+import signal
+import statistics
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+
+from hashfi.core.monitor import ThreatMonitor
+from hashfi.core.session import SessionManager
+from hashfi.sensors.keyboard_sensor import KeyboardPanicSensor
+from hashfi.sensors.signal_sensor import SignalPanicSensor
+from hashfi.sensors.system_sensor import SystemSensor
+
+PUSH_BUDGET_MS = 50.0  # Half the CLI loop's 0.1 s poll interval
+
+
+def make_session() -> SessionManager:
+    session = SessionManager()
+    with redirect_stdout(io.StringIO()):
+        session.start_session()
+        for i in range(20):
+            session.store_secret(f"secret{i}", "x" * 256)
+    return session
+
+
+def run_trial(mode: str) -> float:
+    session = make_session()
+    burned = threading.Event()
+
+    def on_breach():
+        with redirect_stdout(io.StringIO()):
+            session.burn_session()
+        burned.set()
+
+    monitor = ThreatMonitor(threshold=0.9)
+    monitor.on_threshold_breach = on_breach
+    monitor.add_sensor(SystemSensor())
+
+    read_fd, write_fd = os.pipe()
+    stream = os.fdopen(read_fd, "r")
+    keyboard = KeyboardPanicSensor(stream=stream)
+    monitor.add_sensor(keyboard)
+    sig = SignalPanicSensor()
+    sig.install()
+    monitor.add_sensor(sig)
+
+    stop = threading.Event()
+
+    def poll_loop():
+        # Same shape as the CLI loop: poll, then sleep 0.1s.
+        while not stop.is_set() and not burned.is_set():
+            monitor.check_threats()
+            time.sleep(0.1)
+
+    if mode.endswith("push"):
+        keyboard.start()
+    poller = threading.Thread(target=poll_loop, daemon=True)
+    poller.start()
+    time.sleep(0.35)  # Land somewhere in the middle of a poll cycle
+
+    start = time.perf_counter()
+    if mode.startswith("key"):
+        os.write(write_fd, b"p")
+    else:
+        os.kill(os.getpid(), signal.SIGUSR1)
+    burned.wait(5)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    keyboard.stop()
+    poller.join()
+    os.close(write_fd)
+    stream.close()
+    signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+    return elapsed
+
+
+def main():
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    over = []
+    for mode in ("key-poll", "key-push", "signal-push"):
+        samples = [run_trial(mode) * 1000 for _ in range(trials)]
+        print(
+            f"{mode:12s} median {statistics.median(samples):7.2f} ms"
+            f"  max {max(samples):7.2f} ms"
+        )
+        if mode.endswith("push") and max(samples) > PUSH_BUDGET_MS:
+            over.append(f"{mode} {max(samples):.2f} ms")
+    if over:
+        sys.exit(f"Panic latency over the {PUSH_BUDGET_MS:.0f} ms budget: {over}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compares sandbox backends: a disk-backed temp dir, a /dev/shm tmpfs dir
+and an anonymous memfd, each with the storage engines they support.
+Times storing a vault and burning the session.
+
+    python -m benchmarks.bench_sandbox [secrets] [size]
+"""
+
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+
+from hashfi.core.session import SessionManager
+
+CASES = (
+    ("disk", "directory", False),
+    ("disk", "segment", False),
+    ("shm", "directory", False),
+    ("shm", "segment", False),
+    ("memfd", "segment", False),
+    ("memfd", "segment", True),
+)
+
+
+def run(sandbox: str, storage: str, lock_memory: bool, count: int, size: int):
+    session = SessionManager(storage=storage, sandbox=sandbox, lock_memory=lock_memory)
+    with redirect_stdout(io.StringIO()):
+        session.start_session()
+    content = "x" * size
+
+    start = time.perf_counter()
+    session.store_secrets((f"secret{i:06d}", content) for i in range(count))
+    store = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        session.burn_session()
+    burn = time.perf_counter() - start
+    return store, burn
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    print(f"{count} secrets of {size} bytes")
+    for sandbox, storage, lock_memory in CASES:
+        store, burn = run(sandbox, storage, lock_memory, count, size)
+        label = f"{sandbox}/{storage}" + ("+mlock" if lock_memory else "")
+        print(f"{label:20s}  store {store * 1000:8.1f} ms  burn {burn * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Times the old per-byte secure_wipe loop against the memset wipe and
+SecretBuffer.wipe, then burns a session and checks that the memory behind
+its session secret and vault key really reads back as zeros, and that
+the hash it displays is not the secret.
+
+    python -m benchmarks.bench_secret_wipe
+"""
+
+import ctypes
+import io
+import time
+from contextlib import redirect_stdout
+
+from hashfi.core.session import SessionManager
+from hashfi.utils.crypto import secure_wipe
+from hashfi.utils.secretbuffer import SecretBuffer
+
+
+def wipe_loop(data: bytearray):
+    # The previous secure_wipe.
+    for i in range(len(data)):
+        data[i] = 0
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def check_session_wipe():
+    session = SessionManager()
+    with redirect_stdout(io.StringIO()):
+        session.start_session()
+    session.store_secret("probe", "x")
+    # Hold the buffers so their memory stays allocated after the burn.
+    held = [session._session_hash, session.vault_key]
+    regions = [(ctypes.addressof(b._pin), len(b)) for b in held]
+    before = [ctypes.string_at(addr, n) != bytes(n) for addr, n in regions]
+    shown = session.get_hash()
+    revealed = shown in session._session_hash.view.hex()
+    with redirect_stdout(io.StringIO()):
+        session.burn_session()
+    after = [ctypes.string_at(addr, n) == bytes(n) for addr, n in regions]
+    leftovers = [
+        name
+        for name in ("_session_hash", "vault_key", "_cipher")
+        if getattr(session, name) is not None
+    ]
+    print(f"session secret/key non-zero before burn: {before}")
+    print(f"session secret/key zeroed after burn:    {after}")
+    print(f"session attributes still set:           {leftovers or 'none'}")
+    print(f"buffers locked in RAM:                  {[b.locked for b in held]}")
+    print(f"displayed hash reveals the secret:      {revealed}")
+
+
+def main():
+    for size in (64 * 1024, 4 * 1024 * 1024, 64 * 1024 * 1024):
+        label = f"{size // 1024:6d} KB"
+        loop = timed(wipe_loop, bytearray(b"\xff" * size)) if size <= 4 << 20 else None
+        memset = timed(secure_wipe, bytearray(b"\xff" * size))
+        buffer = SecretBuffer.from_bytes(b"\xff" * size)
+        wipe = timed(buffer.wipe)
+        loop_text = f"{loop * 1e6:11.0f} us" if loop is not None else "    skipped"
+        print(
+            f"{label}  loop {loop_text}  memset {memset * 1e6:8.0f} us"
+            f"  SecretBuffer.wipe {wipe * 1e6:8.0f} us"
+        )
+    check_session_wipe()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Peak memory and time of the chunked shredder against the old approach
+(one os.urandom(length) per pass), then shred_tree over a directory of
+small files with one worker and with several.
+
+    python -m benchmarks.bench_shred [file_mb] [tree_files]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from hashfi.core.shredder import secure_shred, shred_tree
+
+
+def shred_whole(file_path, passes=3):
+    # The previous implementation, kept here for comparison.
+    length = os.path.getsize(file_path)
+    with open(file_path, "r+b") as f:
+        for _ in range(passes):
+            f.seek(0)
+            f.write(os.urandom(length))
+            f.flush()
+            os.fsync(f.fileno())
+    os.remove(file_path)
+
+
+def make_file(path: str, size: int):
+    with open(path, "wb") as f:
+        f.truncate(size)
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    file_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    tree_files = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    work = tempfile.mkdtemp(prefix="hashfi_bench_shred_")
+    try:
+        path = os.path.join(work, "big.bin")
+        print(f"single file, {file_mb} MB, 3 passes")
+        for label, fn in (("whole", shred_whole), ("chunked", secure_shred)):
+            make_file(path, file_mb * 1024 * 1024)
+            elapsed, peak = measure(fn, path)
+            print(f"  {label:8s} {elapsed:6.2f} s  peak {peak / 1024 / 1024:8.1f} MB")
+
+        print(f"tree of {tree_files} files of 16 KB, 3 passes")
+        for workers in (1, 4, 8):
+            tree = os.path.join(work, "tree")
+            for i in range(tree_files):
+                sub = os.path.join(tree, f"d{i % 50}")
+                os.makedirs(sub, exist_ok=True)
+                make_file(os.path.join(sub, f"f{i}"), 16 * 1024)
+            elapsed, peak = measure(shred_tree, [tree], 3, workers)
+            print(
+                f"  workers {workers}  {elapsed:6.2f} s"
+                f"  peak {peak / 1024 / 1024:8.1f} MB"
+            )
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
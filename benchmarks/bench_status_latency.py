@@ -0,0 +1,129 @@
+"""
+Load test: /api/status latency while concurrent large vault writes run,
+with vault I/O on its executor and with the old inline calls. The server
+runs under uvicorn in a child process so client work does not share its
+event loop.
+
+    python -m benchmarks.bench_status_latency [writers] [secret_kb] [seconds]
+"""
+
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def serve(mode: str, port: int):
+    os.environ["VERCEL"] = "1"  # No monitor/deadman threads
+    import uvicorn
+
+    from hashfi.web import app as web
+
+    if mode == "inline":
+
+        async def run_inline(fn, *args):
+            return fn(*args)
+
+        web.vault_io.run = run_inline
+    uvicorn.run(web.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def measure(base_url: str, writers: int, secret_kb: int, seconds: float):
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as c:
+        for _ in range(100):
+            try:
+                await c.get("/api/status")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+
+        stop = asyncio.Event()
+        payload = "x" * (secret_kb * 1024)
+        headers = {"Content-Type": "application/json"}
+        writes = 0
+
+        async def writer(n):
+            nonlocal writes
+            bodies = [
+                json.dumps({"name": f"w{n}-{i}", "content": payload}).encode()
+                for i in range(4)
+            ]
+            i = 0
+            while not stop.is_set():
+                await c.post("/api/vault", content=bodies[i % 4], headers=headers)
+                writes += 1
+                i += 1
+
+        tasks = [asyncio.create_task(writer(n)) for n in range(writers)]
+        # Requests go out on a fixed 10 ms schedule and latency is measured
+        # from the scheduled time, so a stalled server loop shows up as
+        # latency instead of as fewer samples.
+        latencies = []
+        scheduled = time.perf_counter()
+        deadline = scheduled + seconds
+        while scheduled < deadline:
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            await c.get("/api/status")
+            latencies.append((time.perf_counter() - scheduled) * 1000)
+            # A missed slot is not replayed, or catch-up would pile on load
+            scheduled = max(scheduled + 0.01, time.perf_counter())
+        stop.set()
+        await asyncio.gather(*tasks)
+    return latencies, writes
+
+
+def run_case(mode: str, writers: int, secret_kb: int, seconds: float):
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_status_latency", "--serve"]
+        + [mode, str(port)],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        return asyncio.run(
+            measure(f"http://127.0.0.1:{port}", writers, secret_kb, seconds)
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        serve(sys.argv[2], int(sys.argv[3]))
+        return
+
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    secret_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+    cases = [("idle", "executor", 0), ("executor", "executor", writers)]
+    cases.append(("inline", "inline", writers))
+    for label, mode, n in cases:
+        latencies, writes = run_case(mode, n, secret_kb, seconds)
+        print(
+            f"{label:9s} writers {n:2d}  writes {writes:5d}"
+            f"  p50 {statistics.median(latencies):7.2f} ms"
+            f"  p99 {percentile(latencies, 99):7.2f} ms"
+            f"  max {max(latencies):7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compares the NumPy LSB engine against the pure-Python reference and checks
+that both produce identical images and decoded text.
+
+    python -m benchmarks.bench_stegano [width] [height] [message_chars]
+"""
+
+import io
+import os
+import sys
+import time
+
+from PIL import Image
+
+from hashfi.core import stegano
+
+
+def make_image(width: int, height: int) -> bytes:
+    img = Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    chars = int(sys.argv[3]) if len(sys.argv) > 3 else 10_000
+    image = make_image(width, height)
+    message = ("hashfi sentinel " * (chars // 16 + 1))[:chars]
+
+    t_py_enc, py_png = timed(stegano._encode_lsb_py, io.BytesIO(image), message)
+    t_np_enc, np_png = timed(
+        stegano.encode_lsb, io.BytesIO(image), message, 1, False, 1
+    )
+    assert py_png.getvalue() == np_png.getvalue(), "encoded images differ"
+
+    t_py_dec, py_text = timed(stegano._decode_lsb_py, io.BytesIO(np_png.getvalue()))
+    t_np_dec, np_text = timed(stegano.decode_lsb, io.BytesIO(np_png.getvalue()))
+    assert py_text == np_text == message, "decoded text differs"
+
+    print(f"image {width}x{height}, message {chars} chars")
+    print(f"encode: python {t_py_enc * 1000:9.1f} ms  numpy {t_np_enc * 1000:9.1f} ms")
+    print(f"decode: python {t_py_dec * 1000:9.1f} ms  numpy {t_np_dec * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Exports a 100k-secret vault to an encrypted archive and imports it into a
+fresh session, against the dashboard's previous approach of collecting
+every secret into one JSON document and encrypting that in one go.
+Reports time and peak traced Python memory for each.
+
+    python -m benchmarks.bench_vault_export [secrets]
+"""
+
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from hashfi.core.session import SessionManager
+
+PASSPHRASE = "correct horse battery staple"
+PIECE = 64 * 1024  # Typical ASGI request body message
+
+
+def started_session(storage: str) -> SessionManager:
+    session = SessionManager(storage=storage)
+    with redirect_stdout(io.StringIO()):
+        session.start_session()
+    return session
+
+
+def traced(fn):
+    """(result, seconds untraced, peak MB while traced, MB still held)."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = fn()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / (1 << 20), held / (1 << 20)
+
+
+def materialized_export(session: SessionManager) -> bytes:
+    # The previous path: the whole vault as one dict, one JSON string and
+    # one ciphertext, all in memory at once.
+    vault = dict(session.iter_secrets())
+    nonce = os.urandom(12)
+    key = AESGCM(AESGCM.generate_key(256))
+    return nonce + key.encrypt(nonce, json.dumps(vault).encode(), None)
+
+
+def streamed_export(session: SessionManager) -> list:
+    sizes = [len(piece) for piece in session.export_vault(PASSPHRASE)]
+    return sizes
+
+
+def report(storage: str, label: str, seconds: float, peak: float, held: float, note):
+    print(
+        f"{storage:9s} {label:15s} {seconds:6.2f} s  peak {peak:6.1f} MB"
+        f"  held after {held:6.1f} MB  ({note})"
+    )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    items = [(f"secret_{i:06d}", os.urandom(24).hex()) for i in range(count)]
+    for storage in ("directory", "segment"):
+        session = started_session(storage)
+        session.store_secrets(items)
+
+        blob, *stats = traced(lambda: materialized_export(session))
+        report(storage, "one-shot export", *stats, f"{len(blob) >> 10} KB")
+        del blob
+
+        sizes, *stats = traced(lambda: streamed_export(session))
+        report(storage, "streamed export", *stats, f"{sum(sizes) >> 10} KB")
+
+        archive = b"".join(session.export_vault(PASSPHRASE))
+        targets = []
+
+        def restore():
+            # A fresh session each run; what it still holds afterwards is
+            # the restored vault's index, not import buffers.
+            target = started_session(storage)
+            targets.append(target)
+            restore = target.import_vault(PASSPHRASE)
+            for start in range(0, len(archive), PIECE):
+                restore.feed(archive[start : start + PIECE])
+            return restore.finish()
+
+        (stored, failed), *stats = traced(restore)
+        assert stored == count and not failed
+        report(storage, "streamed import", *stats, f"{stored} secrets")
+        with redirect_stdout(io.StringIO()):
+            for s in [session] + targets:
+                s.burn_session()
+
+
+if __name__ == "__main__":
+    main()
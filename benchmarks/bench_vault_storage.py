@@ -0,0 +1,58 @@
+"""
+Compares the vault storage engines: one file per secret against a single
+append-only segment. Times storing, overwriting, reading back and burning.
+
+    python -m benchmarks.bench_vault_storage [secrets] [size]
+"""
+
+import io
+import sys
+import time
+from contextlib import redirect_stdout
+
+from hashfi.core.session import SessionManager
+
+
+def run(storage: str, count: int, size: int):
+    session = SessionManager(storage=storage)
+    with redirect_stdout(io.StringIO()):
+        session.start_session()
+    content = "x" * size
+    timings = {}
+
+    start = time.perf_counter()
+    session.store_secrets((f"secret{i:06d}", content) for i in range(count))
+    timings["store"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    session.store_secrets((f"secret{i:06d}", content) for i in range(0, count, 2))
+    timings["overwrite"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in session.iter_secrets():
+        pass
+    timings["read"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        session.burn_session()
+    timings["burn"] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    print(f"{count} secrets of {size} bytes")
+    for storage in ("directory", "segment"):
+        timings = run(storage, count, size)
+        print(
+            f"{storage:10s}"
+            + "".join(
+                f"  {step} {secs * 1000:8.1f} ms" for step, secs in timings.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
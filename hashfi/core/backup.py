@@ -0,0 +1,201 @@
+import os
+import struct
+from typing import Iterator, List, Optional, Tuple
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+from hashfi.utils.ciphers import (
+    BACKENDS,
+    STREAM_CHUNK_SIZE,
+    STREAM_HEADER_SIZE,
+    StreamChunker,
+    StreamOpener,
+    StreamSealer,
+)
+
+# Archive layout: MAGIC, the KDF header (format version, scrypt log2(n),
+# r, p and salt), the stream header, then length-prefixed AES-256-GCM
+# chunks. The chunks decrypt to a sequence of entries:
+#   secret: ENTRY(SECRET, len(name)), name, PIECE(len(data)), data
+#   blob:   ENTRY(BLOB, len(name)), name, then PIECE(n) + n bytes per
+#           piece, ended by PIECE(0)
+MAGIC = b"HFVX"
+ARCHIVE_VERSION = 1
+KDF_HEADER = struct.Struct(">BBBB16s")
+PRELUDE_SIZE = len(MAGIC) + KDF_HEADER.size + STREAM_HEADER_SIZE
+FRAME = struct.Struct(">I")
+ENTRY = struct.Struct(">BH")
+PIECE = struct.Struct(">I")
+SECRET, BLOB = 1, 2
+
+# scrypt cost for archives (n = 2**15, about 32 MB). The header is read
+# before anything is authenticated, so import accepts only these values;
+# anything else could make an unauthenticated upload pick the KDF cost.
+SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P = 15, 8, 1
+
+AES_GCM = BACKENDS["aes-gcm"]
+MAX_FRAME = STREAM_CHUNK_SIZE + 16  # One chunk and its tag
+
+# Events from ArchiveReader: ("secret", name, data), ("blob", name, None),
+# ("piece", None, data) and ("end", None, None) for the end of a blob.
+Event = Tuple[str, Optional[str], Optional[bytes]]
+
+
+def _archive_key(passphrase: str, salt: bytes, log_n: int, r: int, p: int):
+    kdf = Scrypt(salt=salt, length=32, n=1 << log_n, r=r, p=p)
+    return AESGCM(kdf.derive(passphrase.encode()))
+
+
+class ArchiveWriter:
+    """
+    Builds a passphrase-protected vault archive one entry at a time. Every
+    method returns the bytes ready to send, which are empty until a full
+    chunk has accumulated, so a vault of any size is written in one pass.
+    """
+
+    def __init__(self, passphrase: str):
+        salt = os.urandom(16)
+        aead = _archive_key(passphrase, salt, SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P)
+        self._chunker = StreamChunker(StreamSealer(aead, AES_GCM))
+        kdf = KDF_HEADER.pack(ARCHIVE_VERSION, SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P, salt)
+        self.prelude = MAGIC + kdf + self._chunker.sealer.header
+
+    def _feed(self, data: bytes) -> bytes:
+        sealed = self._chunker.feed(data)
+        if not sealed:
+            return b""
+        return b"".join(FRAME.pack(len(chunk)) + chunk for chunk in sealed)
+
+    def secret(self, name: str, data: bytes) -> bytes:
+        encoded = name.encode()
+        header = ENTRY.pack(SECRET, len(encoded))
+        return self._feed(header + encoded + PIECE.pack(len(data)) + data)
+
+    def blob(self, name: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        encoded = name.encode()
+        yield self._feed(ENTRY.pack(BLOB, len(encoded)) + encoded)
+        for chunk in chunks:
+            if chunk:
+                yield self._feed(PIECE.pack(len(chunk)) + chunk)
+        yield self._feed(PIECE.pack(0))
+
+    def close(self) -> bytes:
+        last = self._chunker.close()
+        return FRAME.pack(len(last)) + last
+
+
+class ArchiveReader:
+    """
+    Parses an archive fed in arbitrary pieces. Each chunk is authenticated
+    before any entry in it is returned; the chunk read last is held back
+    until the next one arrives, or finish(), so that a truncated archive
+    fails instead of passing for a complete one. Raises ValueError for a
+    wrong passphrase or a corrupted or cut-off archive.
+    """
+
+    def __init__(self, passphrase: str):
+        self._passphrase = passphrase
+        self._raw = bytearray()
+        self._opener: Optional[StreamOpener] = None
+        self._held: Optional[bytes] = None
+        self._plain = bytearray()
+        self._in_blob = False
+
+    def feed(self, data: bytes) -> List[Event]:
+        self._raw += data
+        events: List[Event] = []
+        if self._opener is None:
+            if len(self._raw) < PRELUDE_SIZE:
+                return events
+            self._start()
+        pos = 0
+        while len(self._raw) - pos >= FRAME.size:
+            (length,) = FRAME.unpack_from(self._raw, pos)
+            if length > MAX_FRAME:
+                raise ValueError("Archive is corrupted")
+            end = pos + FRAME.size + length
+            if len(self._raw) < end:
+                break
+            if self._held is not None:
+                self._open(self._held, False, events)
+            self._held = bytes(self._raw[pos + FRAME.size : end])
+            pos = end
+        del self._raw[:pos]
+        return events
+
+    def finish(self) -> List[Event]:
+        if self._opener is None or self._held is None or self._raw:
+            raise ValueError("Archive is truncated")
+        events: List[Event] = []
+        self._open(self._held, True, events)
+        self._held = None
+        if self._plain or self._in_blob:
+            raise ValueError("Archive is truncated")
+        return events
+
+    def _start(self):
+        if self._raw[: len(MAGIC)] != MAGIC:
+            raise ValueError("Not a vault archive")
+        version, log_n, r, p, salt = KDF_HEADER.unpack_from(self._raw, len(MAGIC))
+        if version != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported vault archive version {version}")
+        if (log_n, r, p) != (SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P):
+            raise ValueError("Unsupported vault archive key parameters")
+        aead = _archive_key(self._passphrase, salt, log_n, r, p)
+        header = bytes(self._raw[len(MAGIC) + KDF_HEADER.size : PRELUDE_SIZE])
+        self._opener = StreamOpener({AES_GCM: aead}, header)
+        del self._raw[:PRELUDE_SIZE]
+
+    def _open(self, chunk: bytes, last: bool, events: List[Event]):
+        try:
+            self._plain += self._opener.open(chunk, last)
+        except InvalidTag:
+            raise ValueError("Wrong passphrase or corrupted archive")
+        self._parse(events)
+
+    def _parse(self, events: List[Event]):
+        plain, pos = self._plain, 0
+        while True:
+            available = len(plain) - pos
+            if self._in_blob:
+                if available < PIECE.size:
+                    break
+                (length,) = PIECE.unpack_from(plain, pos)
+                if available < PIECE.size + length:
+                    break
+                start = pos + PIECE.size
+                pos = start + length
+                if length:
+                    events.append(("piece", None, bytes(plain[start:pos])))
+                else:
+                    self._in_blob = False
+                    events.append(("end", None, None))
+                continue
+            if available < ENTRY.size:
+                break
+            kind, name_length = ENTRY.unpack_from(plain, pos)
+            name_end = pos + ENTRY.size + name_length
+            if kind == BLOB:
+                if len(plain) < name_end:
+                    break
+                name = plain[pos + ENTRY.size : name_end].decode()
+                events.append(("blob", name, None))
+                self._in_blob = True
+                pos = name_end
+            elif kind == SECRET:
+                if len(plain) < name_end + PIECE.size:
+                    break
+                (length,) = PIECE.unpack_from(plain, name_end)
+                data_start = name_end + PIECE.size
+                if len(plain) < data_start + length:
+                    break
+                name = plain[pos + ENTRY.size : name_end].decode()
+                events.append(
+                    ("secret", name, bytes(plain[data_start : data_start + length]))
+                )
+                pos = data_start + length
+            else:
+                raise ValueError(f"Unknown vault archive entry {kind}")
+        del plain[:pos]
@@ -0,0 +1,205 @@
+import hashlib
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+class IndexEntry(NamedTuple):
+    size: int
+    mtime_ns: int
+    inode: int
+    digest: str
+
+
+def hash_file(path: str) -> str:
+    """Returns the SHA-256 hex digest of a file's contents."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def rollup(entries: Dict[str, IndexEntry], root: str) -> Dict[str, str]:
+    """
+    Builds Merkle-style digests for every directory under root.
+    A directory digest covers the names and digests of its children, so two
+    directories with equal digests hold identical subtrees. root is
+    normalised, so a trailing slash still matches the parents of its paths.
+    """
+    root = os.path.normpath(root)
+    children: Dict[str, List[Tuple[str, str]]] = {}
+    for path, entry in entries.items():
+        children.setdefault(os.path.dirname(path), []).append(
+            (os.path.basename(path), entry.digest)
+        )
+
+    # Make sure every ancestor up to root exists, even with no files of its own.
+    for directory in list(children):
+        while directory != root and directory.startswith(root):
+            directory = os.path.dirname(directory)
+            children.setdefault(directory, [])
+    children.setdefault(root, [])
+
+    dir_digests: Dict[str, str] = {}
+    # Deepest directories first so child digests exist before their parents.
+    for directory in sorted(children, key=lambda d: d.count(os.sep), reverse=True):
+        h = hashlib.sha256()
+        for name, digest in sorted(children[directory]):
+            h.update(f"{name}\0{digest}\n".encode())
+        dir_digests[directory] = h.hexdigest()
+        if directory != root:
+            children[os.path.dirname(directory)].append(
+                (os.path.basename(directory) + os.sep, dir_digests[directory])
+            )
+    return dir_digests
+
+
+class FileIndex:
+    """
+    Persistent (path, size, mtime, inode, digest) index backed by SQLite.
+    Files whose inode, size and mtime match the stored entry are not rehashed.
+    """
+
+    def __init__(self, db_path: str, workers: Optional[int] = None):
+        self.db_path = db_path
+        self.workers = workers or os.cpu_count() or 4
+        self.entries: Dict[str, IndexEntry] = {}
+        self.dir_digests: Dict[str, str] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER,"
+            " mtime_ns INTEGER, inode INTEGER, digest TEXT)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, digest TEXT)"
+        )
+        return conn
+
+    def load(self) -> bool:
+        """Loads the stored index. Returns False if there was nothing to load."""
+        if not os.path.exists(self.db_path):
+            return False
+        conn = self._connect()
+        try:
+            self.entries = {
+                row[0]: IndexEntry(*row[1:])
+                for row in conn.execute(
+                    "SELECT path, size, mtime_ns, inode, digest FROM files"
+                )
+            }
+            self.dir_digests = dict(conn.execute("SELECT path, digest FROM dirs"))
+        finally:
+            conn.close()
+        return bool(self.entries or self.dir_digests)
+
+    def save(self):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM files")
+                conn.execute("DELETE FROM dirs")
+                conn.executemany(
+                    "INSERT INTO files VALUES (?, ?, ?, ?, ?)",
+                    ((path, *entry) for path, entry in self.entries.items()),
+                )
+                conn.executemany(
+                    "INSERT INTO dirs VALUES (?, ?)", self.dir_digests.items()
+                )
+        finally:
+            conn.close()
+
+    def scan(
+        self,
+        root: str,
+        files: Iterable[Tuple[str, os.stat_result]],
+        rehash: bool = False,
+    ) -> Tuple[Dict[str, IndexEntry], Dict[str, str]]:
+        """
+        Indexes the (path, stat) pairs from files and returns fresh
+        (entries, dir_digests) without touching the stored index. Unchanged
+        files reuse their cached digest unless rehash is set, which forces
+        every file to be read again.
+        """
+        fresh: Dict[str, IndexEntry] = {}
+        to_hash: List[Tuple[str, os.stat_result]] = []
+
+        for path, st in files:
+            cached = self.entries.get(path)
+            if (
+                not rehash
+                and cached is not None
+                and cached.inode == st.st_ino
+                and cached.size == st.st_size
+                and cached.mtime_ns == st.st_mtime_ns
+            ):
+                fresh[path] = cached
+            else:
+                to_hash.append((path, st))
+
+        if to_hash:
+            # hashlib drops the GIL while digesting, so threads scale across cores.
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                digests = pool.map(
+                    self._hash_or_none, (path for path, _ in to_hash), chunksize=16
+                )
+                for (path, st), digest in zip(to_hash, digests):
+                    if digest is not None:
+                        fresh[path] = IndexEntry(
+                            st.st_size, st.st_mtime_ns, st.st_ino, digest
+                        )
+
+        return fresh, rollup(fresh, root)
+
+    @staticmethod
+    def _hash_or_none(path: str) -> Optional[str]:
+        try:
+            return hash_file(path)
+        except OSError:
+            return None
+
+    def update(self, entries: Dict[str, IndexEntry], dir_digests: Dict[str, str]):
+        self.entries = entries
+        self.dir_digests = dir_digests
+
+    def diff(
+        self,
+        root: str,
+        entries: Dict[str, IndexEntry],
+        dir_digests: Dict[str, str],
+    ) -> Set[str]:
+        """
+        Returns paths that were added, removed or changed relative to the
+        stored index. Subtrees whose directory digest is unchanged are skipped.
+        """
+        root = os.path.normpath(root)
+        changed: Set[str] = set()
+        if self.dir_digests.get(root) == dir_digests.get(root):
+            return changed
+
+        old_by_dir: Dict[str, List[str]] = {}
+        new_by_dir: Dict[str, List[str]] = {}
+        for path in self.entries:
+            old_by_dir.setdefault(os.path.dirname(path), []).append(path)
+        for path in entries:
+            new_by_dir.setdefault(os.path.dirname(path), []).append(path)
+
+        subdirs: Dict[str, Set[str]] = {}
+        for directory in set(self.dir_digests) | set(dir_digests):
+            if directory != root:
+                subdirs.setdefault(os.path.dirname(directory), set()).add(directory)
+
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            if self.dir_digests.get(directory) == dir_digests.get(directory):
+                continue
+            for path in set(old_by_dir.get(directory, ())) | set(
+                new_by_dir.get(directory, ())
+            ):
+                old, new = self.entries.get(path), entries.get(path)
+                if old is None or new is None or old.digest != new.digest:
+                    changed.add(path)
+            stack.extend(subdirs.get(directory, ()))
+
+        return changed
@@ -1,30 +1,148 @@
-from typing import List, Callable
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Callable, Optional
 from hashfi.sensors.base import BaseSensor
+from hashfi.core.timeseries import ThreatHistory
+
+
+class SensorState:
+    """Latest result and scheduling bookkeeping for one sensor."""
+
+    def __init__(self):
+        self.score: Optional[float] = None
+        self.last_started: Optional[float] = None
+        self.last_finished = 0.0
+        self.future: Optional[Future] = None
+        self.overrun = False
+        self.error: Optional[str] = None
 
 
 class ThreatMonitor:
-    def __init__(self, threshold: float = 0.9):
+    def __init__(
+        self, threshold: float = 0.9, tick_timeout: float = 0.5, max_workers: int = 8
+    ):
         self.sensors: List[BaseSensor] = []
         self.threshold = threshold
         self.current_threat_level = 0.0
         self.on_threshold_breach: Callable[[], None] = lambda: None
+        self.on_sensor_overrun: Callable[[BaseSensor], None] = lambda sensor: None
+        # How long check_threats waits for freshly started sensors before
+        # falling back to their cached scores.
+        self.tick_timeout = tick_timeout
+        self.states: Dict[BaseSensor, SensorState] = {}
+        # Per-sensor and aggregate scores over time, for charts and forensics.
+        self.history = ThreatHistory()
+        # Guards the cached scores and scheduling state, reached both from
+        # the polling loop and from a sensor's push. Callbacks run after it
+        # is released, so a slow burn never holds up the other path.
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="sensor"
+        )
 
     def add_sensor(self, sensor: BaseSensor):
         self.sensors.append(sensor)
+        self.states[sensor] = SensorState()
+        sensor.subscribe(self.push)
+
+    def push(self, sensor: BaseSensor, score: float):
+        """
+        Accepts a score pushed by a sensor and re-evaluates the threshold at
+        once, without waiting for the polling loop.
+        """
+        with self._lock:
+            state = self.states[sensor]
+            state.score = score
+            state.last_finished = time.monotonic()
+            breached = self._recompute()
+        if breached:
+            self.on_threshold_breach()
+
+    def _collect(self, sensor: BaseSensor, state: SensorState, now: float) -> bool:
+        """
+        Folds a finished run into the cache, or flags a run past its
+        deadline. Returns True when the sensor has just overrun.
+        """
+        future = state.future
+        if future is None:
+            return False
+        if future.done():
+            state.future = None
+            state.last_finished = now
+            state.overrun = False
+            try:
+                state.score = future.result()
+                state.error = None
+            except Exception as e:
+                state.error = str(e)
+        elif not state.overrun and now - state.last_started > sensor.timeout:
+            state.overrun = True
+            return True
+        return False
 
     def check_threats(self) -> float:
         """
-        Polls all sensors and calculates the weighted average threat level.
+        Starts every sensor whose poll interval has elapsed, in parallel, and
+        calculates the weighted average of the latest cached scores.
         Returns the aggregate threat level (0.0 - 1.0).
         """
         if not self.sensors:
             return 0.0
 
+        now = time.monotonic()
+        started, overrun = [], []
+        with self._lock:
+            for sensor in self.sensors:
+                state = self.states[sensor]
+                if self._collect(sensor, state, now):
+                    overrun.append(sensor)
+                # One run per sensor at a time: an overrunning sensor is left
+                # alone.
+                due = (
+                    state.last_started is None
+                    or now - state.last_started >= sensor.interval
+                )
+                if state.future is None and due:
+                    state.last_started = now
+                    state.future = self._executor.submit(sensor.check_threat)
+                    started.append(state.future)
+
+        if started:
+            wait(started, timeout=self.tick_timeout)
+
+        with self._lock:
+            now = time.monotonic()
+            for sensor in self.sensors:
+                if self._collect(sensor, self.states[sensor], now):
+                    overrun.append(sensor)
+            breached = self._recompute()
+            level = self.current_threat_level
+        for sensor in overrun:
+            self.on_sensor_overrun(sensor)
+        if breached:
+            self.on_threshold_breach()
+        return level
+
+    def _recompute(self) -> bool:
+        """
+        Weighted average of cached scores, then the threshold check. Returns
+        True when the threshold is breached; the caller runs the breach
+        callback once it has released the lock.
+        """
         total_score = 0.0
         total_weight = 0.0
+        critical_score = 0.0
 
         for sensor in self.sensors:
-            score = sensor.check_threat()
+            score = self.states[sensor].score
+            if score is None:
+                continue  # Not reported yet
+            if sensor.critical:
+                # Kept out of the average so an idle panic sensor does not
+                # dilute the others; it only ever raises the level.
+                critical_score = max(critical_score, score)
+                continue
             total_score += score * sensor.weight
             total_weight += sensor.weight
 
@@ -32,9 +150,26 @@ class ThreatMonitor:
             self.current_threat_level = 0.0
         else:
             self.current_threat_level = total_score / total_weight
+        if critical_score >= self.threshold:
+            self.current_threat_level = max(self.current_threat_level, critical_score)
 
-        # Check threshold
-        if self.current_threat_level >= self.threshold:
-            self.on_threshold_breach()
+        now = time.time()
+        for sensor in self.sensors:
+            score = self.states[sensor].score
+            if score is not None:
+                self.history.record(sensor.name, score, now)
+        self.history.record(ThreatHistory.AGGREGATE, self.current_threat_level, now)
+
+        return self.current_threat_level >= self.threshold
 
-        return self.current_threat_level
+    def get_sensor_status(self) -> List[dict]:
+        """Per-sensor cached scores and health, for dashboards."""
+        return [
+            {
+                "name": sensor.name,
+                "score": self.states[sensor].score,
+                "overrun": self.states[sensor].overrun,
+                "error": self.states[sensor].error,
+            }
+            for sensor in self.sensors
+        ]
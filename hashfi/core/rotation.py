@@ -0,0 +1,80 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from hashfi.utils.ciphers import KeyRing
+
+ROTATE_BATCH = 512  # Records per worker task
+
+
+def reencrypt(ring: KeyRing, batch: List[Tuple[str, bytes]]) -> List[Optional[bytes]]:
+    """Re-encrypts records under the ring's current key; None where one fails."""
+    records = []
+    for name, record in batch:
+        try:
+            records.append(ring.encrypt(ring.decrypt(record)))
+        except Exception as e:
+            print(f"[KeyRotation] Failed to re-encrypt '{name}': {e}")
+            records.append(None)
+    return records
+
+
+def rotation_pool(workers: int) -> ThreadPoolExecutor:
+    """
+    A pool of threads sharing the session's key ring. AES-GCM and
+    ChaCha20-Poly1305 release the GIL while they run, and unlike worker
+    processes the threads hold no copy of either key that a burn in the
+    middle of a rotation could not reach.
+    """
+    return ThreadPoolExecutor(workers, thread_name_prefix="rotate")
+
+
+class RotationProgress:
+    """Thread-safe running totals for one key rotation."""
+
+    def __init__(self, old_key_id: int, key_id: int, workers: int):
+        self.old_key_id = old_key_id
+        self.key_id = key_id
+        self.workers = workers
+        self.records_total = 0  # Records and blobs examined, over all passes
+        self.rotated = 0
+        self.skipped = 0  # Already under the new key, or rewritten meanwhile
+        self.failed: List[str] = []
+        self.passes = 0
+        self.started = time.monotonic()
+        self.seconds: Optional[float] = None
+        self.finished = False
+        self.complete = False  # Old key retired
+        self._lock = threading.Lock()
+
+    def add(self, total: int = 0, rotated: int = 0, skipped: int = 0):
+        with self._lock:
+            self.records_total += total
+            self.rotated += rotated
+            self.skipped += skipped
+
+    def fail(self, name: str):
+        with self._lock:
+            self.failed.append(name)
+
+    def finish(self, complete: bool):
+        self.seconds = time.monotonic() - self.started
+        self.complete = complete
+        self.finished = True
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "old_key_id": self.old_key_id,
+                "key_id": self.key_id,
+                "workers": self.workers,
+                "records_total": self.records_total,
+                "rotated": self.rotated,
+                "skipped": self.skipped,
+                "failed": list(self.failed),
+                "passes": self.passes,
+                "seconds": self.seconds,
+                "finished": self.finished,
+                "complete": self.complete,
+            }
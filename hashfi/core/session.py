@@ -1,98 +1,697 @@
 import secrets
 import time
-import tempfile
-import shutil
 import os
 import hashlib
 import base64
-from typing import Optional, List, Dict
+import threading
+from bisect import bisect_left, insort
+from collections import deque
+from itertools import chain
+from typing import (
+    Callable,
+    Optional,
+    List,
+    Dict,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Set,
+    Tuple,
+)
 from hashfi.utils.crypto import (
     generate_salt,
-    generate_session_hash,
+    generate_session_secret,
     derive_key,
+    make_cipher,
     encrypt_data,
     decrypt_data,
 )
+from hashfi.utils.ciphers import (
+    KeyRing,
+    StreamChunker,
+    record_key_id,
+    stream_key_id,
+)
+from hashfi.utils.secretbuffer import SecretBuffer
+from hashfi.core.backup import ArchiveReader, ArchiveWriter
+from hashfi.core.rotation import (
+    ROTATE_BATCH,
+    RotationProgress,
+    reencrypt,
+    rotation_pool,
+)
+from hashfi.core.shredder import shred_tree
+from hashfi.core.vault_store import create_sandbox, open_store
+
+
+class SecretInfo(NamedTuple):
+    size: int  # encrypted size on disk, in bytes
+    created: float
+    updated: float
+    blob: bool = False  # Streamed binary item, read back with iter_blob()
+
+
+class BlobWriter:
+    """
+    Encrypts a binary item as it arrives, in STREAM_CHUNK_SIZE chunks, and
+    hands each sealed chunk straight to the store. At most one chunk plus
+    the latest write is buffered, whatever the item's size. Nothing is
+    visible in the vault until commit(); abort() throws the item away.
+    """
+
+    def __init__(self, session: "SessionManager", name: str, store, cipher):
+        self._session = session
+        self.name = name
+        self._store = store
+        self._chunker = StreamChunker(cipher.sealer())
+        self.key_id = self._chunker.sealer.key_id
+        self._writer = store.open_writer(name)
+        self._writer.write(self._chunker.sealer.header)
+        self.size = 0  # Plaintext bytes received
+        self.closed = False
+
+    def write(self, data: bytes):
+        self.size += len(data)
+        for sealed in self._chunker.feed(data):
+            self._writer.write(sealed)
+
+    def commit(self) -> bool:
+        try:
+            self._writer.write(self._chunker.close())
+            return self._session._commit_blob(self)
+        except Exception as e:
+            print(f"[SessionManager] Failed to store blob '{self.name}': {e}")
+            self.abort()
+            return False
+        finally:
+            self._session._blob_closed(self)
+
+    def abort(self):
+        try:
+            self._writer.abort()
+        except Exception:
+            pass  # Store already closed by a burn
+        self._session._blob_closed(self)
+
+
+class VaultImport:
+    """
+    Restores an archive from export_vault() as it arrives. feed() takes
+    the archive in pieces of any size and stores the entries of every
+    chunk that authenticates; finish() checks that the archive was
+    complete. Entries stored before a failure are kept.
+    """
+
+    def __init__(self, session: "SessionManager", passphrase: str):
+        self._session = session
+        self._reader = ArchiveReader(passphrase)
+        self._blob: Optional[BlobWriter] = None
+        self.stored = 0
+        self.failed: List[str] = []
+
+    def feed(self, data: bytes):
+        try:
+            self._apply(self._reader.feed(data))
+        except Exception:
+            self.abort()
+            raise
+
+    def finish(self) -> Tuple[int, List[str]]:
+        try:
+            self._apply(self._reader.finish())
+        except Exception:
+            self.abort()
+            raise
+        return self.stored, self.failed
+
+    def abort(self):
+        if self._blob is not None:
+            self._blob.abort()
+            self._blob = None
+
+    def _apply(self, events):
+        secrets = []
+        for kind, name, data in events:
+            if kind == "secret":
+                secrets.append((name, data.decode()))
+            elif kind == "blob":
+                self._blob = self._session.open_blob(name)
+                if self._blob is None:
+                    raise ValueError("Session burned")
+            elif kind == "piece":
+                self._blob.write(data)
+            else:
+                blob, self._blob = self._blob, None
+                if blob.commit():
+                    self.stored += 1
+                else:
+                    self.failed.append(blob.name)
+        if secrets:
+            stored, failed = self._session.store_secrets(secrets)
+            self.stored += stored
+            self.failed += failed
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """Smallest string greater than every string starting with prefix."""
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            return prefix[:-1] + chr(last + 1)
+        prefix = prefix[:-1]
+    return None
 
 
 class SessionManager:
-    def __init__(self):
-        self._session_hash: Optional[str] = None
+    def __init__(
+        self,
+        storage: str = "directory",
+        sandbox: str = "disk",
+        lock_memory: bool = False,
+        shred_passes: int = 0,
+        teardown_budget: Optional[float] = None,
+        teardown_workers: int = 8,
+        cipher: str = "aes-gcm",
+        rotate_workers: Optional[int] = None,
+    ):
+        # Session secret and vault key live in SecretBuffers so a burn can
+        # zero the actual memory rather than just dropping references.
+        self._session_hash: Optional[SecretBuffer] = None
+        # What gets displayed and published instead: a domain-separated
+        # hash of the secret, which identifies the session without
+        # revealing it (or the vault key derived from it).
+        self._fingerprint: Optional[str] = None
         self._salt: Optional[str] = None
         self._start_time: Optional[float] = None
         self.sandbox_path: Optional[str] = None
-        self.vault_key: Optional[bytes] = None
+        self.vault_key: Optional[SecretBuffer] = None
         self.is_active = False
+        # Vault storage engine: "directory" (one file per secret) or
+        # "segment" (one append-only mmap'd file, see vault_store.py).
+        self.storage = storage
+        self._store = None
+        # Where the sandbox lives: "disk", "shm" (tmpfs) or "memfd" (anonymous
+        # memory, always with segment storage). lock_memory mlock()s the
+        # segment mapping.
+        self.sandbox = sandbox
+        self.lock_memory = lock_memory
+        # Built once per session instead of on every encrypt/decrypt.
+        # cipher names the write backend: "aes-gcm", "chacha20" or "fernet";
+        # records from any of them can be read back.
+        self.cipher = cipher
+        self._cipher: Optional[KeyRing] = None
+        # In-memory vault index: name -> SecretInfo, plus a sorted name list
+        # for prefix filtering and pagination without touching the disk.
+        self._index: Dict[str, SecretInfo] = {}
+        self._sorted_names: List[str] = []
+        self._lock = threading.RLock()
+        # Writes to a name, and rotation's re-encryption of it, serialise
+        # on one of these stripes instead of on the whole session.
+        self._name_locks = [threading.Lock() for _ in range(64)]
+        # Key rotation: re-encrypts the vault under a new key (see
+        # rotate_key). Keys being rotated out stay in _old_keys until no
+        # record or upload still needs them.
+        self.rotate_workers = rotate_workers or os.cpu_count() or 1
+        self._old_keys: Dict[int, SecretBuffer] = {}
+        self._rotation: Optional[RotationProgress] = None
+        self._stale_names: Set[str] = set()  # Written under an old key mid-rotation
+        self._open_blobs: Dict[int, int] = {}  # key id -> uploads in progress
+        self._blobs_changed = threading.Condition(self._lock)
+        self.last_rotation: Optional[dict] = None
+        self.on_rotation_complete: Callable[[dict], None] = lambda report: None
+        # Sandbox teardown after a burn: files are overwritten shred_passes
+        # times (0 only unlinks them) until teardown_budget seconds have
+        # passed, after which the rest are just unlinked.
+        self.shred_passes = shred_passes
+        self.teardown_budget = teardown_budget
+        self.teardown_workers = teardown_workers
+        self.teardown_done = threading.Event()
+        self.teardown_done.set()
+        self.last_teardown: Optional[dict] = None
+        self.on_teardown_complete: Callable[[dict], None] = lambda report: None
 
     def start_session(self):
         """Starts a new secure session."""
         self._salt = generate_salt()
         # Use system time and random bytes as entropy
         entropy = f"{time.time()}{secrets.token_hex(32)}"
-        self._session_hash = generate_session_hash(self._salt, entropy)
+        self._session_hash = generate_session_secret(self._salt, entropy)
+        h = hashlib.sha256(b"hashfi:fingerprint:")
+        h.update(self._session_hash.view)
+        self._fingerprint = h.hexdigest()[:32]
         self._start_time = time.time()
 
         # Derive encryption key from session hash
         self.vault_key = derive_key(self._session_hash)
+        self._cipher = KeyRing(make_cipher(self.vault_key, self.cipher))
+        self._index = {}
+        self._sorted_names = []
+        self._old_keys = {}
+        self._rotation = None
+        self._stale_names = set()
+        self._open_blobs = {}
 
         # Create a secure sandbox directory
-        self.sandbox_path = tempfile.mkdtemp(prefix="hashfi_session_")
+        try:
+            self.sandbox_path = create_sandbox(self.sandbox)
+        except OSError as e:
+            print(f"[SessionManager] {self.sandbox} sandbox unavailable: {e}")
+            self.sandbox_path = create_sandbox("disk")
+        storage = self.storage if self.sandbox_path else "segment"
+        self._store = open_store(storage, self.sandbox_path, self.lock_memory)
 
         self.is_active = True
-        print(f"[SessionManager] Session started. Hash: {self._session_hash[:8]}...")
-        print(f"[SessionManager] Secure Workspace: {self.sandbox_path}")
+        print(f"[SessionManager] Session started. Hash: {self.get_hash()[:8]}...")
+        print(f"[SessionManager] Secure Workspace: {self.get_sandbox()}")
 
     def store_secret(self, name: str, content: str) -> bool:
         """Encrypts and stores a secret in the sandbox."""
-        if not self.is_active or not self.sandbox_path or not self.vault_key:
+        if not self.is_active or not self._store or not self.vault_key:
             return False
 
         try:
-            encrypted_data = encrypt_data(self.vault_key, content)
-            file_path = os.path.join(self.sandbox_path, f"{name}.enc")
-            with open(file_path, "wb") as f:
-                f.write(encrypted_data)
+            self._put_secret(self._store, self._cipher, name, content)
             return True
         except Exception as e:
             print(f"[SessionManager] Failed to store secret: {e}")
             return False
 
+    def store_secrets(self, items: Iterable[Tuple[str, str]]) -> Tuple[int, List[str]]:
+        """
+        Encrypts and stores many secrets in one pass with the session cipher.
+        Returns (stored count, names that failed).
+        """
+        if not self.is_active or not self._store or not self._cipher:
+            return 0, [name for name, _ in items]
+
+        cipher, store = self._cipher, self._store
+        stored, failed = 0, []
+        for name, content in items:
+            try:
+                self._put_secret(store, cipher, name, content)
+                stored += 1
+            except Exception as e:
+                print(f"[SessionManager] Failed to store secret '{name}': {e}")
+                failed.append(name)
+        return stored, failed
+
+    def _name_lock(self, name: str) -> threading.Lock:
+        return self._name_locks[hash(name) % len(self._name_locks)]
+
+    def _put_secret(self, store, cipher: KeyRing, name: str, content: str):
+        # Encrypting under the stripe lock means that once rotation holds
+        # every stripe, no record under the old key can still be in flight.
+        with self._name_lock(name):
+            encrypted_data = encrypt_data(cipher, content)
+            if self._is_blob(name):
+                store.discard(name)
+            store.put(name, encrypted_data)
+            self._index_put(name, len(encrypted_data))
+            self._note_key(name, record_key_id(encrypted_data))
+
+    def _note_key(self, name: str, key_id: Optional[int]):
+        """Flags a write that landed under an old key during a rotation."""
+        rotation = self._rotation
+        if rotation is not None and key_id != rotation.key_id:
+            with self._lock:
+                self._stale_names.add(name)
+
+    def iter_secrets(
+        self, names: Optional[Iterable[str]] = None
+    ) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Yields (name, plaintext) for the given names, or the whole vault, one
+        at a time so callers can stream without holding every secret.
+        Missing or undecryptable secrets, and blobs, yield None as plaintext.
+        """
+        if not self.is_active or not self._store or not self._cipher:
+            return
+        cipher, store = self._cipher, self._store
+        if names is None:
+            names = self.get_secrets_list()
+        for name in names:
+            info = self._index.get(name)
+            if info is None or info.blob:
+                yield name, None
+                continue
+            try:
+                yield name, decrypt_data(cipher, store.get(name))
+            except Exception as e:
+                print(f"[SessionManager] Failed to retrieve secret '{name}': {e}")
+                yield name, None
+
+    def open_blob(self, name: str) -> Optional[BlobWriter]:
+        """
+        Starts a streamed binary item. Feed it with write() and finish with
+        commit() (or abort()); both block on store I/O, so async callers
+        should run them off the event loop.
+        """
+        with self._lock:
+            if not self.is_active or not self._store or not self._cipher:
+                return None
+            blob = BlobWriter(self, name, self._store, self._cipher)
+            self._open_blobs[blob.key_id] = self._open_blobs.get(blob.key_id, 0) + 1
+            return blob
+
+    def _commit_blob(self, blob: BlobWriter) -> bool:
+        with self._name_lock(blob.name), self._lock:
+            if blob._store is not self._store:
+                blob.abort()  # The session was burned mid-upload
+                return False
+            info = self._index.get(blob.name)
+            if info is not None and not info.blob:
+                self._store.discard(blob.name)
+            blob._writer.commit()
+            self._index_put(blob.name, blob._writer.size, blob=True)
+            self._note_key(blob.name, blob.key_id)
+        return True
+
+    def _blob_closed(self, blob: BlobWriter):
+        with self._lock:
+            if blob.closed:
+                return
+            blob.closed = True
+            if blob._store is self._store:
+                self._open_blobs[blob.key_id] -= 1
+                self._blobs_changed.notify_all()
+
+    def iter_blob(self, name: str) -> Optional[Iterator[bytes]]:
+        """
+        Decrypted chunks of a binary item, or None if name is not one.
+        Each chunk is authenticated before it is yielded; a tampered or
+        truncated item raises partway through.
+        """
+        if not self.is_active or not self._store or not self._cipher:
+            return None
+        if not self._is_blob(name):
+            return None
+        pieces = self._store.get_stream(name)
+        if pieces is None:
+            return None
+        return self._cipher.decrypt_stream(pieces)
+
+    def export_vault(self, passphrase: str) -> Optional[Iterator[bytes]]:
+        """
+        The whole vault, secrets and binary items, as one archive encrypted
+        under passphrase. Yields it in pieces of at most a chunk or so,
+        decrypting records one at a time, so the vault is never held in
+        memory. Items written while the export runs may or may not be in it.
+        """
+        if not self.is_active or not self._store or not self._cipher:
+            return None
+        return self._export(passphrase, self._cipher, self._store)
+
+    def _export(self, passphrase: str, cipher, store) -> Iterator[bytes]:
+        archive = ArchiveWriter(passphrase)
+        yield archive.prelude
+        for name in self.get_secrets_list():
+            info = self._index.get(name)
+            if info is None:
+                continue  # Gone since the listing
+            try:
+                if info.blob:
+                    pieces = store.get_stream(name)
+                    if pieces is not None:
+                        yield from archive.blob(name, cipher.decrypt_stream(pieces))
+                    continue
+                record = store.get(name)
+                if record is not None:
+                    yield archive.secret(name, cipher.decrypt(record))
+            except Exception as e:
+                # A broken blob is cut off mid-entry, so the archive is
+                # unusable; fail the whole export rather than write it.
+                print(f"[SessionManager] Failed to export '{name}': {e}")
+                raise
+        yield archive.close()
+
+    def import_vault(self, passphrase: str) -> Optional[VaultImport]:
+        """Starts restoring an export_vault() archive into this session."""
+        if not self.is_active or not self._store or not self._cipher:
+            return None
+        return VaultImport(self, passphrase)
+
+    def _is_blob(self, name: str) -> bool:
+        info = self._index.get(name)
+        return info is not None and info.blob
+
+    def _index_put(self, name: str, size: int, blob: bool = False):
+        now = time.time()
+        with self._lock:
+            existing = self._index.get(name)
+            if existing is None:
+                insort(self._sorted_names, name)
+                self._index[name] = SecretInfo(size, now, now, blob)
+            else:
+                self._index[name] = SecretInfo(size, existing.created, now, blob)
+
     def get_secrets_list(self) -> List[str]:
         """Returns a list of stored secret names."""
-        if not self.is_active or not self.sandbox_path:
-            return []
-        try:
-            files = [
-                f.replace(".enc", "")
-                for f in os.listdir(self.sandbox_path)
-                if f.endswith(".enc")
-            ]
-            return files
-        except:
+        if not self.is_active or not self._store:
             return []
+        with self._lock:
+            return list(self._sorted_names)
+
+    def list_secrets(
+        self, prefix: str = "", offset: int = 0, limit: Optional[int] = None
+    ) -> Tuple[List[str], int]:
+        """
+        Returns (names, total) for secrets starting with prefix, in name
+        order. names is the page [offset, offset + limit); total counts every
+        match. Served from the in-memory index.
+        """
+        if not self.is_active:
+            return [], 0
+        with self._lock:
+            names = self._sorted_names
+            lo = bisect_left(names, prefix)
+            upper = _prefix_upper_bound(prefix)
+            hi = bisect_left(names, upper, lo) if upper is not None else len(names)
+            start = min(lo + offset, hi)
+            end = hi if limit is None else min(start + limit, hi)
+            return names[start:end], hi - lo
+
+    def get_secret_info(self, name: str) -> Optional[SecretInfo]:
+        with self._lock:
+            return self._index.get(name)
 
     def retrieve_secret(self, name: str) -> Optional[str]:
         """Retrieves and decrypts a secret."""
-        if not self.is_active or not self.sandbox_path or not self.vault_key:
+        if not self.is_active or not self._store or not self.vault_key:
             return None
 
-        file_path = os.path.join(self.sandbox_path, f"{name}.enc")
-        if not os.path.exists(file_path):
+        info = self._index.get(name)
+        if info is None or info.blob:
             return None
 
         try:
-            with open(file_path, "rb") as f:
-                encrypted_data = f.read()
-            return decrypt_data(self.vault_key, encrypted_data)
+            encrypted_data = self._store.get(name)
+            return decrypt_data(self._cipher, encrypted_data)
         except Exception as e:
             print(f"[SessionManager] Failed to retrieve secret: {e}")
             return None
 
+    @property
+    def key_id(self) -> Optional[int]:
+        """Id of the key new records are written with; bumped by rotate_key."""
+        cipher = self._cipher
+        return cipher.current.key_id if cipher else None
+
+    @property
+    def rotation(self) -> Optional[RotationProgress]:
+        """The key rotation in progress, if any."""
+        return self._rotation
+
+    def rotate_key(
+        self, workers: Optional[int] = None, wait: bool = True
+    ) -> Optional[RotationProgress]:
+        """
+        Rotates the vault key without taking the vault offline. A new key is
+        derived from the session secret and fresh randomness and used for
+        every write from this moment on; then every record still under the
+        old key is re-encrypted, in batches on a pool of worker threads
+        (one per core by default), and swapped in only if it has not been
+        rewritten meanwhile. Records carry their key id, so reads work
+        throughout, with either key. The old key is retired and wiped once
+        nothing needs it. Runs in this call, or on a background thread when
+        wait is False; on_rotation_complete receives the report.
+        """
+        with self._lock:
+            if not self.is_active or not self._store or not self._cipher:
+                return None
+            if self._rotation is not None:
+                raise ValueError("A key rotation is already running")
+            ring = self._cipher
+            if ring.backend == "fernet":
+                raise ValueError("Fernet records carry no key id to rotate")
+            old_id = ring.current.key_id
+            key_id = (old_id + 1) % 0x10000
+            key = derive_key(self._session_hash, os.urandom(16))
+            ring.add(make_cipher(key, self.cipher, key_id))
+            self._old_keys[old_id] = self.vault_key
+            self.vault_key = key
+            progress = RotationProgress(old_id, key_id, workers or self.rotate_workers)
+            self._rotation = progress
+            names = list(self._sorted_names)
+        print(f"[SessionManager] Rotating vault key {old_id} -> {key_id}...")
+
+        args = (progress, self._store, ring, names)
+        if wait:
+            self._rotate(*args)
+        else:
+            threading.Thread(target=self._rotate, args=args, daemon=True).start()
+        return progress
+
+    def _rotate(self, progress: RotationProgress, store, ring: KeyRing, names):
+        complete = False
+        pool = rotation_pool(progress.workers)
+        try:
+            while self._store is store:
+                if names:
+                    self._rotate_pass(progress, store, ring, pool, names)
+                names = self._retire_key(progress, store, ring)
+                if names is None:
+                    complete = self._store is store
+                    break
+        except Exception as e:
+            print(f"[SessionManager] Key rotation failed: {e}")
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            with self._lock:
+                if self._rotation is progress:
+                    self._rotation = None
+        progress.finish(complete)
+        report = progress.as_dict()
+        self.last_rotation = report
+        print(
+            f"[SessionManager] Key rotation {'complete' if complete else 'stopped'}: "
+            f"{progress.rotated} records in {progress.seconds:.2f}s"
+        )
+        self.on_rotation_complete(report)
+
+    def _rotate_pass(self, progress: RotationProgress, store, ring, pool, names):
+        """Re-encrypts the records of names still under an old key."""
+        progress.passes += 1
+        in_flight = deque()
+        batch: List[Tuple[str, bytes]] = []
+
+        def submit(drain: bool = False):
+            if batch:
+                in_flight.append(
+                    (list(batch), pool.submit(reencrypt, ring, list(batch)))
+                )
+                batch.clear()
+            # Bounded, so a huge vault is read only as fast as workers keep up
+            while in_flight and (drain or len(in_flight) > 2 * progress.workers):
+                done, future = in_flight.popleft()
+                self._swap_records(progress, store, done, future.result())
+
+        for name in names:
+            if self._store is not store:
+                break  # Burned
+            info = self._index.get(name)
+            if info is None:
+                continue
+            progress.add(total=1)
+            if info.blob:
+                self._reseal_blob(progress, store, ring, name, info)
+                continue
+            record = store.get(name)
+            if record is None or record_key_id(record) == progress.key_id:
+                progress.add(skipped=1)
+                continue
+            batch.append((name, bytes(record)))
+            if len(batch) >= ROTATE_BATCH:
+                submit()
+        submit(drain=True)
+
+    def _swap_records(self, progress: RotationProgress, store, batch, records):
+        for (name, old), new in zip(batch, records):
+            if new is None:
+                progress.fail(name)
+                continue
+            with self._name_lock(name):
+                # Compare and swap: a write since the read already used
+                # the new key and must not be overwritten.
+                current = store.get(name) if self._store is store else None
+                if current is None or current != old:
+                    progress.add(skipped=1)
+                    continue
+                store.put(name, new)
+                self._index_resize(name, len(new))
+            progress.add(rotated=1)
+
+    def _reseal_blob(self, progress, store, ring: KeyRing, name, info: SecretInfo):
+        """Re-encrypts one binary item chunk by chunk under the current key."""
+        pieces = store.get_stream(name)
+        header = next(pieces, None) if pieces is not None else None
+        if header is None or stream_key_id(header) == progress.key_id:
+            progress.add(skipped=1)
+            return
+        writer = store.open_writer(name)
+        try:
+            chunker = StreamChunker(ring.current.sealer())
+            writer.write(chunker.sealer.header)
+            for chunk in ring.decrypt_stream(chain([header], pieces)):
+                for sealed in chunker.feed(chunk):
+                    writer.write(sealed)
+            writer.write(chunker.close())
+            with self._name_lock(name), self._lock:
+                if self._store is not store or self._index.get(name) is not info:
+                    writer.abort()  # Replaced meanwhile
+                    progress.add(skipped=1)
+                    return
+                writer.commit()
+                self._index_resize(name, writer.size)
+            progress.add(rotated=1)
+        except Exception as e:
+            print(f"[SessionManager] Failed to re-encrypt '{name}': {e}")
+            writer.abort()
+            progress.fail(name)
+
+    def _retire_key(self, progress: RotationProgress, store, ring: KeyRing):
+        """
+        Retires the old key if nothing needs it any more and returns None;
+        otherwise returns the names to sweep again. Holds every name stripe
+        so no write under the old key can be half done while it checks.
+        """
+        for lock in self._name_locks:
+            lock.acquire()
+        try:
+            with self._lock:
+                if self._store is not store:
+                    return None
+                stale, self._stale_names = self._stale_names, set()
+                uploads = self._open_blobs.get(progress.old_key_id, 0)
+                if not stale and not uploads:
+                    ring.retire(progress.old_key_id)
+                    self._old_keys.pop(progress.old_key_id).wipe()
+                    return None
+        finally:
+            for lock in self._name_locks:
+                lock.release()
+        if not stale:
+            # Only uploads sealed under the old key are left. They have to
+            # land (and are swept next) or fail before the key can go.
+            with self._lock:
+                self._blobs_changed.wait(timeout=1)
+        return sorted(stale)
+
+    def _index_resize(self, name: str, size: int):
+        with self._lock:
+            info = self._index.get(name)
+            if info is not None:
+                self._index[name] = info._replace(size=size)
+
     def get_hash(self) -> Optional[str]:
-        """Returns the current session hash."""
-        return self._session_hash
+        """
+        Returns the session fingerprint for display. Never the secret
+        itself: a str copy of that could not be wiped by a burn.
+        """
+        return self._fingerprint
 
     def get_sandbox(self) -> Optional[str]:
+        if self.sandbox_path is None and self._store is not None:
+            return self._store.path  # memfd sandbox has no directory
         return self.sandbox_path
 
     def derive_service_credential(
@@ -102,39 +701,96 @@ class SessionManager:
         if not self.is_active or not self._session_hash:
             return None
 
-        # Combine session hash and service name
-        data = f"{self._session_hash}:{service_name}".encode("utf-8")
-        # Hash it
-        digest = hashlib.sha256(data).digest()
+        # Hash the session secret (in place) and the service name
+        h = hashlib.sha256(self._session_hash.view)
+        h.update(f":{service_name}".encode("utf-8"))
+        digest = h.digest()
         # Encode to base64 to make it printable
         b64 = base64.urlsafe_b64encode(digest).decode("utf-8")
         # Return the first 'length' characters
         return b64[:length]
 
-    def burn_session(self):
-        """Securely wipes the session hash."""
-        if self._session_hash:
-            # In a real low-level language, we'd overwrite memory.
-            # In Python, we just dereference and hope GC picks it up,
-            # but we can conceptually 'wipe' it.
+    def burn_session(self, wait: bool = True):
+        """
+        Burns the session in two phases. First, at once and under the lock,
+        the key, cipher and index are dropped and the session is marked
+        inactive, so nothing can decrypt the vault from this point on. Then
+        the sandbox is torn down: in this call, or on a background thread
+        when wait is False. on_teardown_complete receives the report.
+        """
+        with self._lock:
+            if not self._session_hash:
+                return
+            # Zero the session secret and key in place. The cipher objects
+            # keep their own copies, which can only be dereferenced.
+            self._session_hash.wipe()
             self._session_hash = None
+            self._fingerprint = None
             self._salt = None
             self._start_time = None
+            self.vault_key.wipe()
             self.vault_key = None  # Lose the key!
-
-            # Nuke the sandbox
-            if self.sandbox_path and os.path.exists(self.sandbox_path):
-                try:
-                    shutil.rmtree(self.sandbox_path)
-                    print(f"[SessionManager] Sandbox {self.sandbox_path} INCINERATED.")
-                except Exception as e:
-                    print(f"[SessionManager] Failed to incinerate sandbox: {e}")
+            for key in self._old_keys.values():
+                key.wipe()
+            self._old_keys = {}
+            self._cipher = None
+            self._rotation = None  # A running rotation sees this and stops
+            self._stale_names = set()
+            self._open_blobs = {}
+            self._index = {}
+            self._sorted_names = []
+            self.is_active = False
+            store, sandbox = self._store, self.sandbox_path
+            self._store = None
             self.sandbox_path = None
+        if store is not None:
+            store.close()  # A memfd segment is gone right here
+        print("[SessionManager] Session BURNED.")
 
-            self.is_active = False
-            print("[SessionManager] Session BURNED.")
+        # Each teardown gets its own event, so an overlapping burn cannot
+        # clear (or be satisfied by) the event of an earlier one.
+        done = threading.Event()
+        self.teardown_done = done
+        if wait:
+            self._teardown(sandbox, done)
+        else:
+            threading.Thread(
+                target=self._teardown, args=(sandbox, done), daemon=True
+            ).start()
+
+    def _teardown(self, sandbox: Optional[str], done: threading.Event):
+        """Removes the sandbox with parallel workers within teardown_budget."""
+        started = time.monotonic()
+        report = {"sandbox": sandbox, "complete": False}
+        try:
+            if sandbox and os.path.exists(sandbox):
+                deadline = None
+                if self.teardown_budget is not None:
+                    deadline = started + self.teardown_budget
+                progress = shred_tree(
+                    [sandbox],
+                    passes=self.shred_passes,
+                    workers=self.teardown_workers,
+                    deadline=deadline,
+                )
+                report.update(progress.as_dict())
+                if progress.failed:
+                    print(f"[SessionManager] Failed to incinerate: {progress.failed}")
+                else:
+                    print(f"[SessionManager] Sandbox {sandbox} INCINERATED.")
+                report["complete"] = not progress.failed
+            else:
+                report["complete"] = True
+        except Exception as e:
+            print(f"[SessionManager] Sandbox teardown failed: {e}")
+            report["error"] = str(e)
+        finally:
+            report["seconds"] = time.monotonic() - started
+            self.last_teardown = report
+            done.set()
+            self.on_teardown_complete(report)
 
-    def regenerate_session(self):
+    def regenerate_session(self, wait: bool = True):
         """Burns the current session and starts a new one."""
-        self.burn_session()
+        self.burn_session(wait)
         self.start_session()
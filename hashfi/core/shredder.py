@@ -1,24 +1,270 @@
 import os
-import random
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 
+CHUNK_SIZE = 1024 * 1024  # Bytes overwritten per write; also the peak buffer
 
-def secure_shred(file_path, passes=3):
+ProgressCallback = Callable[[int], None]
+
+
+def _random_source():
+    try:
+        return open("/dev/urandom", "rb", buffering=0)
+    except OSError:
+        return None  # e.g. Windows: fall back to os.urandom per chunk
+
+
+def secure_shred(
+    file_path,
+    passes=3,
+    chunk_size: int = CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+    deadline: Optional[float] = None,
+):
     """
     Overwrite the file with random data multiple times before deleting.
+    Works in chunk_size pieces through one reusable buffer, so memory use is
+    the same for any file size. progress, if given, is called with the
+    number of bytes written after each chunk. Once deadline (a
+    time.monotonic() value) has passed, overwriting stops between chunks
+    and the file is just deleted.
     Returns True if successful, False otherwise.
     """
+    return _shred_file(file_path, passes, chunk_size, progress, deadline) is not None
+
+
+def _shred_file(file_path, passes, chunk_size, progress, deadline) -> Optional[bool]:
+    """
+    secure_shred's work: True if the file was overwritten passes times and
+    deleted, False if the deadline cut the overwrite short but it was still
+    deleted, None on failure.
+    """
     try:
         if not os.path.isfile(file_path):
-            return False
+            return None
         length = os.path.getsize(file_path)
-        with open(file_path, "r+b") as f:
-            for _ in range(passes):
-                f.seek(0)
-                f.write(os.urandom(length))
-                f.flush()
-                os.fsync(f.fileno())
+        buffer = bytearray(min(chunk_size, length) or 1)
+        view = memoryview(buffer)
+        source = _random_source()
+        complete = True
+        try:
+            with open(file_path, "r+b", buffering=0) as f:
+                for _ in range(passes):
+                    f.seek(0)
+                    remaining = length
+                    while remaining:
+                        if deadline is not None and time.monotonic() >= deadline:
+                            complete = False
+                            break
+                        n = min(remaining, len(buffer))
+                        if source is not None:
+                            source.readinto(view[:n])
+                        else:
+                            view[:n] = os.urandom(n)
+                        f.write(view[:n])
+                        remaining -= n
+                        if progress:
+                            progress(n)
+                    if not complete:
+                        break
+                    os.fsync(f.fileno())
+        finally:
+            if source is not None:
+                source.close()
         os.remove(file_path)
-        return True
+        return complete
     except Exception as e:
         print(f"Shred error: {e}")
-        return False
+        return None
+
+
+class ShredProgress:
+    """Thread-safe running totals for a batch shred, usable as its callback."""
+
+    def __init__(self, passes: int = 3):
+        self.passes = passes
+        self.files_total = 0
+        self.files_done = 0
+        self.shredded = 0
+        self.unlinked = 0  # Removed without overwriting (links, past deadline)
+        self.bytes_total = 0  # Bytes to write, i.e. size times passes
+        self.bytes_done = 0
+        self.failed: List[str] = []
+        self.finished = False
+        # True when the remainder was removed by a plain sweep, unshredded
+        self.swept = False
+        self._lock = threading.Lock()
+
+    def __call__(self, n: int):
+        with self._lock:
+            self.bytes_done += n
+
+    def add_file(self, size: int):
+        with self._lock:
+            self.files_total += 1
+            self.bytes_total += size * self.passes
+
+    def file_done(self, path: str, ok: bool, overwritten: bool = True):
+        with self._lock:
+            self.files_done += 1
+            if not ok:
+                self.failed.append(path)
+            elif overwritten:
+                self.shredded += 1
+            else:
+                self.unlinked += 1
+
+    def fail(self, path: str):
+        with self._lock:
+            self.failed.append(path)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "files_total": self.files_total,
+                "files_done": self.files_done,
+                "shredded": self.shredded,
+                "unlinked": self.unlinked,
+                "bytes_total": self.bytes_total,
+                "bytes_done": self.bytes_done,
+                "failed": list(self.failed),
+                "swept": self.swept,
+                "finished": self.finished,
+            }
+
+
+def _expand(
+    paths: Iterable[str], dirs: List[str], progress: ShredProgress
+) -> Iterator[Tuple[str, int]]:
+    """
+    Yields (file, size) for every regular file under paths. Directories are
+    appended to dirs deepest-last. Symlinks are yielded with size -1: they
+    are unlinked, never followed, so a link cannot aim the shredder at a
+    file outside the tree. Paths that vanish or cannot be read are recorded
+    as failed and skipped.
+    """
+    for path in paths:
+        try:
+            if os.path.islink(path):
+                yield path, -1
+            elif os.path.isdir(path):
+                stack = [path]
+                while stack:
+                    directory = stack.pop()
+                    try:
+                        it = os.scandir(directory)
+                    except OSError:
+                        progress.fail(directory)
+                        continue
+                    dirs.append(directory)
+                    with it:
+                        yield from _entries(it, directory, stack, progress)
+            elif os.path.isfile(path):
+                yield path, os.path.getsize(path)
+        except OSError:
+            progress.fail(path)
+
+
+def _entries(it, directory: str, stack: List[str], progress: ShredProgress):
+    """Files and links from one scandir iterator; subdirectories go on stack."""
+    while True:
+        try:
+            entry = next(it, None)
+        except OSError:
+            progress.fail(directory)
+            return
+        if entry is None:
+            return
+        try:
+            if entry.is_symlink():
+                yield entry.path, -1
+            elif entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            else:
+                yield entry.path, entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            progress.fail(entry.path)
+
+
+def _sweep(path: str):
+    """Removes path without overwriting anything; links are not followed."""
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.unlink(path)
+
+
+def shred_tree(
+    paths: Iterable[str],
+    passes: int = 3,
+    workers: int = 4,
+    chunk_size: int = CHUNK_SIZE,
+    progress: Optional[ShredProgress] = None,
+    deadline: Optional[float] = None,
+) -> ShredProgress:
+    """
+    Shreds files and whole directory trees with a pool of workers, then
+    removes the emptied directories. Each worker holds one chunk_size
+    buffer, so peak memory is workers * chunk_size however big the files.
+
+    With passes=0, or once deadline (a time.monotonic() value) has passed,
+    whatever is left is swept away with a plain rmtree instead, which
+    bounds how long the tree takes to disappear. Returns the progress
+    object, which lists any paths that failed.
+    """
+    progress = progress or ShredProgress(passes)
+    try:
+        dirs: List[str] = []
+        swept = passes == 0
+
+        def shred_one(item: Tuple[str, int]):
+            path, size = item
+            overwrite = size >= 0 and passes > 0
+            if overwrite and deadline is not None and time.monotonic() >= deadline:
+                overwrite = False
+            if overwrite:
+                result = _shred_file(path, passes, chunk_size, progress, deadline)
+                ok, overwrite = result is not None, result is True
+            else:
+                try:
+                    os.unlink(path)
+                    ok = True
+                except OSError:
+                    ok = False
+            progress.file_done(path, ok, overwrite)
+
+        # Bounds the queue so a huge tree is walked as workers free up, not
+        # listed into memory up front.
+        slots = threading.BoundedSemaphore(workers * 4)
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="shred"
+        ) as pool:
+            for path, size in [] if swept else _expand(paths, dirs, progress):
+                if deadline is not None and time.monotonic() >= deadline:
+                    swept = True
+                    break
+                progress.add_file(max(size, 0))
+                slots.acquire()
+                future = pool.submit(shred_one, (path, size))
+                future.add_done_callback(lambda _: slots.release())
+
+        if swept:
+            progress.swept = True
+            for path in paths:
+                try:
+                    _sweep(path)
+                except OSError:
+                    progress.fail(path)
+        else:
+            for directory in reversed(dirs):  # Deepest first
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    progress.fail(directory)
+    finally:
+        # Set even if the walk fails, so pollers of the job see it end
+        progress.finished = True
+    return progress
@@ -1,16 +1,222 @@
 from PIL import Image
 import io
+import struct
+import zlib
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - pure-Python fallback below
+    np = None
+
+DELIMITER = "1111111111111110"
+
+# v2 header, stored 1 bit per channel across R, G and B of the first pixels:
+# magic, version, bits per channel, flags, payload length in bytes.
+MAGIC = b"HFS"
+FORMAT_VERSION = 2
+FLAG_ZLIB = 0x01
+HEADER = struct.Struct(">3sBBBI")
+HEADER_CHANNELS = HEADER.size * 8
+NOT_FOUND_MESSAGE = "No hidden message found or image too large/corrupted."
+# Largest message, in UTF-8 bytes, that is encoded or decompressed. Bounds
+# what a small compressed payload can inflate to on decode.
+MAX_TEXT = 16 * 1024 * 1024
+
+
+def _text_to_bits(secret_text):
+    """Returns the payload + delimiter bits as a uint8 array of 0/1 values."""
+    try:
+        # Every char below 256 maps to exactly one byte, as format(ord, "08b") did.
+        bits = np.unpackbits(np.frombuffer(secret_text.encode("latin-1"), np.uint8))
+    except UnicodeEncodeError:
+        # Wider code points produce more than 8 bits each; mirror that exactly.
+        binary_text = "".join(format(ord(char), "08b") for char in secret_text)
+        bits = np.frombuffer(binary_text.encode("ascii"), np.uint8) - ord("0")
+    delimiter = np.frombuffer(DELIMITER.encode("ascii"), np.uint8) - ord("0")
+    return np.concatenate([bits, delimiter])
+
+
+def encode_lsb(
+    image_file,
+    secret_text,
+    bits_per_channel=1,
+    compress=False,
+    version=FORMAT_VERSION,
+):
+    """
+    Encodes text into an image using LSB steganography.
+    version=1 writes the legacy red-channel/delimiter format.
+    """
+    if version == 1:
+        return _encode_legacy(image_file, secret_text)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported stegano format version {version}")
+    if not 1 <= bits_per_channel <= 8:
+        raise ValueError("bits_per_channel must be between 1 and 8")
+    if np is None:
+        raise RuntimeError("NumPy is required for the v2 stegano format")
+
+    payload = secret_text.encode("utf-8")
+    if len(payload) > MAX_TEXT:
+        raise ValueError(f"Message is over the {MAX_TEXT}-byte limit")
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 9)
+        flags |= FLAG_ZLIB
 
-def encode_lsb(image_file, secret_text):
-    """Encodes text into an image using LSB steganography."""
+    img = Image.open(image_file)
+    img = img.convert("RGB")
+    channels = np.array(img, dtype=np.uint8).reshape(-1)
+
+    capacity = (channels.size - HEADER_CHANNELS) * bits_per_channel // 8
+    if len(payload) > capacity:
+        raise ValueError(
+            f"Message needs {len(payload)} bytes but image holds {capacity} "
+            f"at {bits_per_channel} bit(s) per channel"
+        )
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, bits_per_channel, flags, len(payload))
+    _embed(channels, 0, np.frombuffer(header, np.uint8), 1)
+    _embed(
+        channels, HEADER_CHANNELS, np.frombuffer(payload, np.uint8), bits_per_channel
+    )
+    img.frombytes(channels.tobytes())
+
+    output = io.BytesIO()
+    img.save(output, format="PNG")
+    output.seek(0)
+    return output
+
+
+def _embed(channels, start, data, bits_per_channel):
+    """Writes data MSB-first into the low bits of channels[start:]."""
+    bits = np.unpackbits(data)
+    pad = -len(bits) % bits_per_channel
+    if pad:
+        bits = np.concatenate([bits, np.zeros(pad, np.uint8)])
+    groups = bits.reshape(-1, bits_per_channel)
+    weights = (1 << np.arange(bits_per_channel - 1, -1, -1)).astype(np.uint8)
+    values = (groups * weights).sum(axis=1, dtype=np.uint16).astype(np.uint8)
+    end = start + len(values)
+    mask = np.uint8((0xFF << bits_per_channel) & 0xFF)
+    channels[start:end] = (channels[start:end] & mask) | values
+
+
+def _extract(channels, nbytes, bits_per_channel):
+    """Reads nbytes written by _embed from the low bits of channels."""
+    count = -(-nbytes * 8 // bits_per_channel)
+    values = channels[:count]
+    shifts = np.arange(bits_per_channel - 1, -1, -1, dtype=np.uint8)
+    bits = ((values[:, None] >> shifts) & 1).astype(np.uint8).reshape(-1)
+    return np.packbits(bits[: nbytes * 8]).tobytes()
+
+
+def _read_rows(img, channels_needed):
+    """Converts only the leading rows needed to cover channels_needed values."""
+    width, height = img.size
+    rows = min(height, -(-channels_needed // (width * 3)))
+    top = img.crop((0, 0, width, rows)).convert("RGB")
+    return np.asarray(top, dtype=np.uint8).reshape(-1)
+
+
+def decode_lsb(image_file):
+    """Decodes text from an image using LSB steganography."""
+    if np is None:
+        return _decode_lsb_py(image_file)
+
+    img = Image.open(image_file)
+    width, height = img.size
+    total_channels = width * height * 3
+
+    if total_channels >= HEADER_CHANNELS:
+        header = _extract(_read_rows(img, HEADER_CHANNELS), HEADER.size, 1)
+        magic, version, bits_per_channel, flags, length = HEADER.unpack(header)
+        if (
+            magic == MAGIC
+            and version == FORMAT_VERSION
+            and 1 <= bits_per_channel <= 8
+            and length * 8 <= (total_channels - HEADER_CHANNELS) * bits_per_channel
+        ):
+            needed = HEADER_CHANNELS + -(-length * 8 // bits_per_channel)
+            channels = _read_rows(img, needed)[HEADER_CHANNELS:]
+            payload = _extract(channels, length, bits_per_channel)
+            try:
+                if flags & FLAG_ZLIB:
+                    payload = _inflate(payload)
+                return payload.decode("utf-8")
+            except (zlib.error, UnicodeDecodeError):
+                pass  # Header was a chance match in a legacy image
+
+    return _decode_legacy(img)
+
+
+def _inflate(payload):
+    """zlib.decompress, but refuses to produce more than MAX_TEXT bytes."""
+    inflater = zlib.decompressobj()
+    text = inflater.decompress(payload, MAX_TEXT)
+    if inflater.unconsumed_tail:
+        raise ValueError(f"Hidden message inflates past {MAX_TEXT} bytes")
+    if not inflater.eof:
+        raise zlib.error("Incomplete compressed message")
+    return text
+
+
+def _encode_legacy(image_file, secret_text):
+    """Writes the v1 format: red-channel LSBs terminated by DELIMITER."""
+    if np is None:
+        return _encode_lsb_py(image_file, secret_text)
+
+    img = Image.open(image_file)
+    img = img.convert("RGB")
+
+    bits = _text_to_bits(secret_text)
+    pixels = np.array(img, dtype=np.uint8)
+    red = pixels[..., 0].reshape(-1)  # row-major, same order as the x/y loop
+    # Payloads longer than the image are truncated, as before.
+    n = min(len(bits), red.size)
+    red[:n] = (red[:n] & 0xFE) | bits[:n]
+    pixels[..., 0] = red.reshape(pixels.shape[:2])
+    img.frombytes(pixels.tobytes())
+
+    output = io.BytesIO()
+    img.save(output, format="PNG")
+    output.seek(0)
+    return output
+
+
+def _decode_legacy(img):
+    """Reads the v1 format from an already opened image."""
+    img = img.convert("RGB")
+
+    bits = np.asarray(img, dtype=np.uint8)[..., 0].reshape(-1) & 1
+
+    # The delimiter is fifteen 1s followed by a 0, so it ends at the first
+    # zero bit preceded by a run of at least fifteen ones.
+    zeros = np.flatnonzero(bits == 0)
+    runs = np.diff(zeros, prepend=-1) - 1
+    hits = zeros[(runs >= 15) & (zeros >= 15)]
+    if hits.size == 0:
+        return NOT_FOUND_MESSAGE
+
+    payload = bits[: hits[0] - 15]
+    whole = len(payload) - len(payload) % 8
+    data = np.packbits(payload[:whole]).tobytes()
+    text = data.decode("latin-1")
+    if whole < len(payload):
+        # A trailing partial group decodes as a short binary number.
+        text += chr(int("".join(map(str, payload[whole:])), 2))
+    return text
+
+
+def _encode_lsb_py(image_file, secret_text):
+    """Pure-Python encoder, used when NumPy is unavailable."""
     img = Image.open(image_file)
     img = img.convert("RGB")
     pixels = img.load()
 
     # Convert text to binary
     binary_text = "".join(format(ord(char), "08b") for char in secret_text)
-    binary_text += "1111111111111110"  # Delimiter
+    binary_text += DELIMITER
 
     data_index = 0
     width, height = img.size
@@ -39,8 +245,8 @@ def encode_lsb(image_file, secret_text):
     return output
 
 
-def decode_lsb(image_file):
-    """Decodes text from an image using LSB steganography."""
+def _decode_lsb_py(image_file):
+    """Pure-Python decoder, used when NumPy is unavailable."""
     img = Image.open(image_file)
     img = img.convert("RGB")
     pixels = img.load()
@@ -56,7 +262,7 @@ def decode_lsb(image_file):
 
             # Check for delimiter every 8 bits (1 byte) + 16 bits (2 bytes delimiter)
             # Optimization: Check for delimiter only when we have enough bits
-            if len(binary_text) >= 16 and binary_text[-16:] == "1111111111111110":
+            if len(binary_text) >= 16 and binary_text[-16:] == DELIMITER:
                 # Found delimiter
                 binary_data = binary_text[:-16]
                 text = ""
@@ -65,4 +271,16 @@ def decode_lsb(image_file):
                     text += chr(int(byte, 2))
                 return text
 
-    return "No hidden message found or image too large/corrupted."
+    return NOT_FOUND_MESSAGE
+
+
+def encode_lsb_file(src_path, secret_text, bits_per_channel=1, compress=False):
+    """Path-based encode_lsb for worker processes. Returns the PNG bytes."""
+    with open(src_path, "rb") as src:
+        return encode_lsb(src, secret_text, bits_per_channel, compress).getvalue()
+
+
+def decode_lsb_file(src_path):
+    """Path-based decode_lsb for worker processes."""
+    with open(src_path, "rb") as src:
+        return decode_lsb(src)
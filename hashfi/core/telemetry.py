@@ -0,0 +1,117 @@
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+import psutil
+
+from hashfi.utils.netstat import ConnectionCounts, count_connections
+
+
+class RingBuffer:
+    """Fixed-capacity ring of floats stored in a flat C array."""
+
+    def __init__(self, capacity: int, typecode: str = "d"):
+        self.capacity = capacity
+        self._data = array(typecode, bytes(array(typecode).itemsize * capacity))
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, value: float):
+        self._data[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def latest(self) -> Optional[float]:
+        if not self._size:
+            return None
+        return self._data[(self._next - 1) % self.capacity]
+
+    def values(self) -> List[float]:
+        """Oldest-to-newest copy of the stored values."""
+        if self._size < self.capacity:
+            return self._data[: self._size].tolist()
+        return (self._data[self._next :] + self._data[: self._next]).tolist()
+
+
+class TelemetrySampler:
+    """
+    Samples host metrics at a fixed rate into ring buffers.
+
+    Readers never call psutil themselves, so the cost of sampling is the
+    same whether one dashboard or a hundred are polling. When the background
+    thread is not running (e.g. serverless), latest() samples on demand but
+    at most once per interval.
+    """
+
+    METRICS = ("cpu_percent", "net_connections")
+
+    def __init__(self, interval: float = 1.0, capacity: int = 300):
+        self.interval = interval
+        self.timestamps = RingBuffer(capacity)
+        self.series: Dict[str, RingBuffer] = {
+            name: RingBuffer(capacity) for name in self.METRICS
+        }
+        self.connections: Optional[ConnectionCounts] = None
+        self.connection_deltas: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # Prime cpu_percent so the first non-blocking reading is meaningful.
+        psutil.cpu_percent(interval=None)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def sample(self):
+        """Takes one reading of every metric. Never blocks on a CPU interval."""
+        cpu = psutil.cpu_percent(interval=None)
+        try:
+            counts = count_connections()
+        except Exception:
+            counts = ConnectionCounts({}, source="unavailable")  # e.g. sandboxed
+
+        with self._lock:
+            self.connection_deltas = counts.diff(self.connections)
+            self.connections = counts
+            self.timestamps.append(time.time())
+            self.series["cpu_percent"].append(cpu)
+            self.series["net_connections"].append(float(counts.total))
+
+    def latest(self) -> Dict[str, Optional[float]]:
+        """Most recent value of each metric, without blocking on psutil."""
+        if self._thread is None:
+            last = self.timestamps.latest()
+            if last is None or time.time() - last >= self.interval:
+                self.sample()
+        with self._lock:
+            reading = {name: buf.latest() for name, buf in self.series.items()}
+            reading["timestamp"] = self.timestamps.latest()
+        return reading
+
+    def connection_states(self) -> Dict[str, int]:
+        """Socket counts by state from the latest sample."""
+        self.latest()
+        with self._lock:
+            return self.connections.by_state() if self.connections else {}
+
+    def history(self, metric: str) -> List[float]:
+        with self._lock:
+            return self.series[metric].values()
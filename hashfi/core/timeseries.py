@@ -0,0 +1,145 @@
+import math
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+# (bucket width in seconds, number of buckets kept)
+DEFAULT_RESOLUTIONS: Tuple[Tuple[int, int], ...] = (
+    (1, 3600),  # 1 s for the last hour
+    (60, 1440),  # 1 min for the last day
+    (3600, 24 * 90),  # 1 h for the last 90 days
+)
+
+
+class _Ring:
+    """One resolution of a series: fixed-width buckets in flat C arrays."""
+
+    def __init__(self, step: int, capacity: int):
+        self.step = step
+        self.capacity = capacity
+        self.bucket = array("q", [-1]) * capacity  # which bucket a slot holds
+        self.total = array("d", bytes(8 * capacity))
+        self.count = array("l", bytes(array("l").itemsize * capacity))
+        self.peak = array("d", bytes(8 * capacity))
+
+    def add(self, t: float, value: float):
+        bucket = int(t // self.step)
+        slot = bucket % self.capacity
+        if self.bucket[slot] != bucket:
+            # Slot still holds an expired bucket: recycle it.
+            self.bucket[slot] = bucket
+            self.total[slot] = 0.0
+            self.count[slot] = 0
+            self.peak[slot] = value
+        self.total[slot] += value
+        self.count[slot] += 1
+        if value > self.peak[slot]:
+            self.peak[slot] = value
+
+    def oldest(self, now: float) -> float:
+        return (int(now // self.step) - self.capacity + 1) * self.step
+
+    def points(self, start: float, end: float) -> List[Tuple[float, float, float, int]]:
+        """(bucket start, sum, max, count) for live buckets in [start, end]."""
+        out = []
+        for bucket in range(int(start // self.step), int(end // self.step) + 1):
+            slot = bucket % self.capacity
+            if self.bucket[slot] == bucket and self.count[slot]:
+                out.append(
+                    (
+                        bucket * self.step,
+                        self.total[slot],
+                        self.peak[slot],
+                        self.count[slot],
+                    )
+                )
+        return out
+
+
+class TimeSeries:
+    """
+    A metric kept at several resolutions at once. Every sample updates each
+    resolution's current bucket, so roll-ups never need a separate pass and
+    memory is fixed by the resolution table, however long the uptime.
+    """
+
+    def __init__(self, resolutions=DEFAULT_RESOLUTIONS):
+        self.rings = [_Ring(step, capacity) for step, capacity in resolutions]
+
+    def add(self, value: float, t: Optional[float] = None):
+        t = time.time() if t is None else t
+        for ring in self.rings:
+            ring.add(t, value)
+
+    def query(
+        self, start: float, end: float, step: Optional[int] = None
+    ) -> Tuple[int, List[dict]]:
+        """
+        Returns (step, points) covering [start, end]. Uses the finest
+        resolution that still reaches back to start and is no finer than step,
+        then re-buckets to step if it is coarser than that resolution.
+        """
+        now = time.time()
+        ring = self.rings[-1]
+        for candidate in self.rings:
+            covers = candidate.oldest(now) <= start + candidate.step
+            if covers and (step is None or candidate.step <= step):
+                ring = candidate
+                break
+        else:
+            # Nothing reaches back far enough at that step: take the finest
+            # resolution that covers start, else the coarsest.
+            for candidate in self.rings:
+                if candidate.oldest(now) <= start + candidate.step:
+                    ring = candidate
+                    break
+
+        start, end = max(start, ring.oldest(now)), min(end, now)
+        out_step = max(step or ring.step, ring.step)
+        out_step -= out_step % ring.step  # Whole source buckets per point
+
+        grouped: Dict[int, List[float]] = {}
+        for t, total, peak, count in ring.points(start, end):
+            key = int(t // out_step) * out_step
+            acc = grouped.setdefault(key, [0.0, -math.inf, 0])
+            acc[0] += total
+            acc[1] = max(acc[1], peak)
+            acc[2] += count
+
+        points = [
+            {"t": t, "avg": total / count, "max": peak}
+            for t, (total, peak, count) in sorted(grouped.items())
+        ]
+        return out_step, points
+
+
+class ThreatHistory:
+    """Aggregate and per-sensor threat scores as TimeSeries, thread-safe."""
+
+    AGGREGATE = "aggregate"
+
+    def __init__(self, resolutions=DEFAULT_RESOLUTIONS):
+        self.resolutions = resolutions
+        self.series: Dict[str, TimeSeries] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, value: float, t: Optional[float] = None):
+        with self._lock:
+            series = self.series.get(name)
+            if series is None:
+                series = self.series[name] = TimeSeries(self.resolutions)
+            series.add(value, t)
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted(self.series)
+
+    def query(
+        self, name: str, start: float, end: float, step: Optional[int] = None
+    ) -> Optional[Tuple[int, List[dict]]]:
+        with self._lock:
+            series = self.series.get(name)
+            if series is None:
+                return None
+            return series.query(start, end, step)
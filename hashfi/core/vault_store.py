@@ -0,0 +1,354 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from hashfi.utils.memlock import lock_pages
+
+Buffer = Union[bytes, memoryview]
+
+SANDBOXES = ("disk", "shm", "memfd")
+SHM_DIR = "/dev/shm"
+
+
+def create_sandbox(kind: str = "disk") -> Optional[str]:
+    """
+    Creates the session sandbox and returns its directory.
+
+    "disk" is a mkdtemp under the system temp dir. "shm" puts it on the
+    /dev/shm tmpfs, so vault files never reach a disk. "memfd" needs no
+    directory at all (returns None): the vault lives in an anonymous
+    memfd owned by the SegmentStore.
+    """
+    if kind == "disk":
+        return tempfile.mkdtemp(prefix="hashfi_session_")
+    if kind == "shm":
+        if not os.path.isdir(SHM_DIR):
+            raise OSError(f"{SHM_DIR} not available")
+        return tempfile.mkdtemp(prefix="hashfi_session_", dir=SHM_DIR)
+    if kind == "memfd":
+        if not hasattr(os, "memfd_create"):
+            raise OSError("memfd_create not available")
+        return None
+    raise ValueError(f"Unknown sandbox '{kind}'")
+
+
+# Streamed items are stored as a sequence of pieces (the cipher's stream
+# header, then each sealed chunk). In files each piece is length-prefixed.
+FRAME = struct.Struct(">I")
+
+
+class _FileWriter:
+    """Writes a streamed item to a temp file, renamed into place on commit."""
+
+    def __init__(self, path: str):
+        self.path = path
+        # One temp file per writer: an upload and a key rotation may both
+        # be rewriting the same item.
+        fd, self._tmp = tempfile.mkstemp(
+            prefix=os.path.basename(path) + ".",
+            suffix=".part",
+            dir=os.path.dirname(path),
+        )
+        self._file = os.fdopen(fd, "wb")
+        self.size = 0
+
+    def write(self, piece: bytes):
+        self._file.write(FRAME.pack(len(piece)))
+        self._file.write(piece)
+        self.size += FRAME.size + len(piece)
+
+    def commit(self):
+        self._file.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.remove(self._tmp)
+        except OSError:
+            pass
+
+
+class DirectoryStore:
+    """
+    One `<name>.enc` file per secret in the sandbox directory, and one
+    `<name>.blob` file per streamed item.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, name: str, suffix: str = ".enc") -> str:
+        return os.path.join(self.root, f"{name}{suffix}")
+
+    def put(self, name: str, data: bytes):
+        with open(self._path(name), "wb") as f:
+            f.write(data)
+
+    def get(self, name: str) -> Optional[Buffer]:
+        try:
+            with open(self._path(name), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def open_writer(self, name: str) -> _FileWriter:
+        return _FileWriter(self._path(name, ".blob"))
+
+    def get_stream(self, name: str) -> Optional[Iterator[Buffer]]:
+        try:
+            f = open(self._path(name, ".blob"), "rb")
+        except FileNotFoundError:
+            return None
+
+        def pieces():
+            with f:
+                while True:
+                    prefix = f.read(FRAME.size)
+                    if len(prefix) < FRAME.size:
+                        return
+                    yield f.read(FRAME.unpack(prefix)[0])
+
+        return pieces()
+
+    def discard(self, name: str):
+        for suffix in (".enc", ".blob"):
+            try:
+                os.remove(self._path(name, suffix))
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        pass
+
+
+# Record header: name length, data length. The name follows, then the data.
+RECORD = struct.Struct(">HI")
+
+Location = Tuple[int, int]  # (data offset, data length)
+
+
+class _SegmentWriter:
+    """Appends a streamed item's pieces as records; visible on commit."""
+
+    def __init__(self, store: "SegmentStore", name: str):
+        self.store = store
+        self.name = name
+        self.locations: List[Location] = []
+        self.size = 0
+        with store._lock:
+            store._pending[id(self)] = (name, self.locations)
+
+    def write(self, piece: bytes):
+        store = self.store
+        with store._lock:
+            offset = store._append(self.name.encode(), piece)
+            self.locations.append((offset, len(piece)))
+            store._pending_bytes += store._record_size(self.name, len(piece))
+        self.size += len(piece)
+
+    def commit(self):
+        store = self.store
+        with store._lock:
+            store._pending.pop(id(self), None)
+            store._pending_bytes -= self._record_bytes()
+            store._drop(self.name)
+            store._chunks[self.name] = self.locations
+            store._live += self._record_bytes()
+            store._maybe_compact()
+
+    def abort(self):
+        store = self.store
+        with store._lock:
+            if store._pending.pop(id(self), None) is not None:
+                store._pending_bytes -= self._record_bytes()  # Now garbage
+
+    def _record_bytes(self) -> int:
+        return sum(self.store._record_size(self.name, n) for _, n in self.locations)
+
+
+class SegmentStore:
+    """
+    The whole vault in one append-only segment file, read through mmap.
+    With root=None the segment is an anonymous memfd instead of a file, and
+    with lock_memory its mapping is mlock()ed so it is never swapped out.
+
+    Every put appends a record and points the offset index at it, so a
+    write is one pwrite and never touches directory metadata. Streamed
+    items are appended a piece at a time, interleaved with other writes,
+    and indexed as a list of locations. Reads return memoryviews straight
+    into the mapping. Overwritten records stay in the file as garbage until
+    it outweighs the live data, at which point compact() rewrites the live
+    records into a fresh segment.
+    """
+
+    FILENAME = "vault.seg"
+    INITIAL_SIZE = 1 << 20
+    # Compact once garbage exceeds both this many bytes and the live data.
+    COMPACT_MIN_GARBAGE = 4 << 20
+    COMPACT_WRITE = 1 << 20
+
+    def __init__(self, root: Optional[str], lock_memory: bool = False):
+        self.root = root
+        self.lock_memory = lock_memory
+        self.path = os.path.join(root, self.FILENAME) if root else "memfd:vault.seg"
+        self._offsets: Dict[str, Location] = {}
+        # Streamed items: name -> locations of their pieces, in order
+        self._chunks: Dict[str, List[Location]] = {}
+        # Streams still being written: writer id -> (name, locations)
+        self._pending: Dict[int, Tuple[str, List[Location]]] = {}
+        self._pending_bytes = 0
+        self._live = 0  # Bytes of records still referenced by the index
+        self._end = 0
+        self._lock = threading.Lock()
+        self._fd = self._open(self.path)
+        self._capacity = 0
+        self._map: Optional[mmap.mmap] = None
+        self._grow(self.INITIAL_SIZE)
+
+    def _grow(self, needed: int):
+        """Extends the file to at least needed bytes and maps the new size."""
+        capacity = max(self._capacity, self.INITIAL_SIZE)
+        while capacity < needed:
+            capacity *= 2
+        os.ftruncate(self._fd, capacity)
+        self._capacity = capacity
+        # Readers may still hold views into the old mapping, so it is not
+        # closed here; it goes away once the last view is released.
+        self._map = mmap.mmap(self._fd, capacity)
+        if self.lock_memory and not lock_pages(self._map):
+            self.lock_memory = False  # Refused once, will be refused again
+
+    def _open(self, path: str) -> int:
+        if self.root is None:
+            return os.memfd_create("hashfi_vault", os.MFD_CLOEXEC)
+        return os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+
+    @staticmethod
+    def _record_size(name: str, length: int) -> int:
+        return RECORD.size + len(name.encode()) + length
+
+    def _append(self, name: bytes, data: bytes) -> int:
+        """Writes one record at the end and returns its data offset."""
+        start = self._end
+        record_end = start + RECORD.size + len(name) + len(data)
+        if record_end > self._capacity:
+            self._grow(record_end)
+        os.pwrite(self._fd, RECORD.pack(len(name), len(data)) + name + data, start)
+        self._end = record_end
+        return record_end - len(data)
+
+    def _drop(self, name: str):
+        """Forgets the current record(s) for name, leaving them as garbage."""
+        location = self._offsets.pop(name, None)
+        if location is not None:
+            self._live -= self._record_size(name, location[1])
+        for _, length in self._chunks.pop(name, ()):
+            self._live -= self._record_size(name, length)
+
+    def _maybe_compact(self):
+        garbage = self._end - self._live - self._pending_bytes
+        if garbage > self.COMPACT_MIN_GARBAGE and garbage > self._live:
+            self._compact()
+
+    def put(self, name: str, data: bytes):
+        with self._lock:
+            offset = self._append(name.encode(), data)
+            self._drop(name)
+            self._offsets[name] = (offset, len(data))
+            self._live += self._record_size(name, len(data))
+            self._maybe_compact()
+
+    def get(self, name: str) -> Optional[Buffer]:
+        with self._lock:
+            location = self._offsets.get(name)
+            if location is None:
+                return None
+            offset, length = location
+            return memoryview(self._map)[offset : offset + length]
+
+    def open_writer(self, name: str) -> _SegmentWriter:
+        return _SegmentWriter(self, name)
+
+    def get_stream(self, name: str) -> Optional[Iterator[Buffer]]:
+        with self._lock:
+            locations = self._chunks.get(name)
+            if locations is None:
+                return None
+            # A snapshot: compaction swaps in new lists and a new mapping,
+            # but this mapping stays valid for as long as it is referenced.
+            locations, view = list(locations), memoryview(self._map)
+        return (view[offset : offset + length] for offset, length in locations)
+
+    def discard(self, name: str):
+        with self._lock:
+            self._drop(name)
+
+    def compact(self):
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        """Rewrites only the live (and pending) records into a new segment."""
+        old_map = self._map
+        tmp_path = self.path + ".compact"
+        self._fd, old_fd = self._open(tmp_path), self._fd
+        self._capacity, self._end = 0, 0
+        self._grow(self._live + self._pending_bytes + self.INITIAL_SIZE)
+        # Records are copied through one buffer and written COMPACT_WRITE
+        # bytes at a time, rather than with a pwrite each, since the lock
+        # is held (and every reader and writer waits) until this finishes.
+        out = bytearray()
+
+        def flush():
+            os.pwrite(self._fd, out, self._end - len(out))
+            out.clear()
+
+        def move(name: str, location: Location) -> Location:
+            offset, length = location
+            encoded = name.encode()
+            out.extend(RECORD.pack(len(encoded), length))
+            out.extend(encoded)
+            out.extend(old_map[offset : offset + length])
+            self._end += RECORD.size + len(encoded) + length
+            if len(out) >= self.COMPACT_WRITE:
+                flush()
+            return self._end - length, length
+
+        self._offsets = {
+            name: move(name, location) for name, location in self._offsets.items()
+        }
+        streams = list(self._chunks.items()) + list(self._pending.values())
+        for name, locations in streams:
+            # In place, so writers still appending keep the same list.
+            locations[:] = [move(name, location) for location in locations]
+        flush()
+        if self.root is not None:
+            os.replace(tmp_path, self.path)
+        os.close(old_fd)
+
+    @property
+    def size(self) -> int:
+        """Bytes of the segment in use, live records and garbage alike."""
+        return self._end
+
+    def close(self):
+        with self._lock:
+            self._offsets = {}
+            self._chunks = {}
+            self._pending = {}
+            self._map = None
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
+
+
+def open_store(kind: str, root: Optional[str], lock_memory: bool = False):
+    if kind == "segment":
+        return SegmentStore(root, lock_memory=lock_memory)
+    if kind == "directory":
+        return DirectoryStore(root)
+    raise ValueError(f"Unknown vault storage '{kind}'")
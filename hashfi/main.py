@@ -82,7 +82,8 @@ def main():
         session_manager = SessionManager()
         monitor = ThreatMonitor(threshold=0.9)
         monitor.add_sensor(SystemSensor())
-        monitor.add_sensor(KeyboardPanicSensor())
+        keyboard_sensor = KeyboardPanicSensor()
+        monitor.add_sensor(keyboard_sensor)
 
         # Callback for auto-burn
         def on_breach():
@@ -92,6 +93,8 @@ def main():
         monitor.on_threshold_breach = on_breach
 
         session_manager.start_session()
+        # Push 'p' straight to the monitor instead of waiting for the next poll
+        keyboard_sensor.start()
 
         layout = generate_layout()
         layout["header"].update(make_header())
@@ -120,6 +123,8 @@ def main():
             console.print("[bold red]Manually interrupted. Session burned.[/bold red]")
             return
 
+        keyboard_sensor.stop()
+
         # Post-loop (Burned state)
         console.clear()
         console.print(
@@ -1,10 +1,26 @@
 from abc import ABC, abstractmethod
+from typing import Callable, List
 
 
 class BaseSensor(ABC):
-    def __init__(self, name: str, weight: float = 1.0):
+    def __init__(
+        self,
+        name: str,
+        weight: float = 1.0,
+        interval: float = 1.0,
+        timeout: float = 5.0,
+        critical: bool = False,
+    ):
         self.name = name
         self.weight = weight
+        # Seconds between polls, and how long a single poll may run before
+        # the monitor flags it as overrunning.
+        self.interval = interval
+        self.timeout = timeout
+        # A critical sensor is not averaged with the others: a score at or
+        # above the threshold breaches on its own.
+        self.critical = critical
+        self._listeners: List[Callable[["BaseSensor", float], None]] = []
 
     @abstractmethod
     def check_threat(self) -> float:
@@ -14,3 +30,15 @@ class BaseSensor(ABC):
         1.0 = Maximum threat
         """
         pass
+
+    def subscribe(self, listener: Callable[["BaseSensor", float], None]):
+        """Registers a callback for scores pushed via report()."""
+        self._listeners.append(listener)
+
+    def report(self, score: float):
+        """
+        Pushes a new score to subscribers immediately, from any thread,
+        instead of waiting for the next poll.
+        """
+        for listener in list(self._listeners):
+            listener(self, score)
@@ -1,55 +1,204 @@
 import os
+import select
+import threading
+from typing import Iterable, Optional, Set
 from hashfi.sensors.base import BaseSensor
+from hashfi.core.file_index import FileIndex
+from hashfi.utils.ignore import IgnoreRules, walk_files
+from hashfi.utils.inotify import (
+    Inotify,
+    inotify_available,
+    IN_CREATE,
+    IN_DELETE,
+    IN_DELETE_SELF,
+    IN_ISDIR,
+    IN_MOVE_SELF,
+    IN_MOVED_FROM,
+    IN_MOVED_TO,
+    IN_Q_OVERFLOW,
+)
 
 
 class FileIntegritySensor(BaseSensor):
-    def __init__(self, target_dir: str):
-        super().__init__(name="File Integrity Monitor", weight=2.0)
-        self.target_dir = target_dir
+    def __init__(
+        self,
+        target_dir: str,
+        use_inotify: bool = True,
+        index_path: Optional[str] = None,
+        verify_content: bool = False,
+        ignore_patterns: Optional[Iterable[str]] = None,
+    ):
+        super().__init__(
+            name="File Integrity Monitor", weight=2.0, interval=1.0, timeout=10.0
+        )
+        # Normalised, so walked paths and their parents match it exactly
+        self.target_dir = target_dir = os.path.abspath(target_dir)
+        # Explicit patterns, else <target_dir>/.hashfiignore, else defaults.
+        self.ignore = IgnoreRules.for_tree(target_dir, ignore_patterns)
         self.file_snapshot = {}
-        self._take_snapshot()
+        self.changes: Set[str] = set()
+        self._lock = threading.Lock()
+        self._inotify = None
+        self._watch_thread = None
+        self._stop = threading.Event()
+
+        # Optional on-disk content index: survives restarts, so changes made
+        # while we were down (even with a preserved mtime) are still caught.
+        self.index: Optional[FileIndex] = None
+        if index_path:
+            self.index = FileIndex(index_path)
+            has_baseline = self.index.load()
+            self.verify(rehash=verify_content, compare=has_baseline)
+
+        if use_inotify and inotify_available():
+            try:
+                self._start_watching()
+            except OSError as e:
+                # e.g. fs.inotify.max_user_watches exhausted
+                print(f"[FileIntegritySensor] inotify unavailable ({e}), polling.")
+                self._stop_watching()
+
+        if self._inotify is None:
+            self._take_snapshot()
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._inotify is not None else "polling"
+
+    def _relpath(self, path: str) -> str:
+        return os.path.relpath(path, self.target_dir).replace(os.sep, "/")
 
     def _take_snapshot(self):
         """Records modification times of all files in target_dir."""
-        self.file_snapshot = {}
-        for root, _, files in os.walk(self.target_dir):
-            if "__pycache__" in root or ".git" in root or ".venv" in root:
-                continue
-            for file in files:
-                if file.endswith(".pyc"):
+        self.file_snapshot = {
+            path: st.st_mtime for path, st in walk_files(self.target_dir, self.ignore)
+        }
+
+    # --- inotify watch mode ---
+
+    def _start_watching(self):
+        self._inotify = Inotify()
+        self._watch_tree(self.target_dir, report_files=False)
+        self._watch_thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self._watch_thread.start()
+
+    def _stop_watching(self):
+        self._stop.set()
+        if self._watch_thread and self._watch_thread is not threading.current_thread():
+            self._watch_thread.join(timeout=1)
+        if self._inotify is not None:
+            self._inotify.close()
+        self._inotify = None
+        self._watch_thread = None
+
+    def _watch_tree(self, top: str, report_files: bool):
+        """
+        Adds a watch on every directory under top. When report_files is set,
+        files found along the way are recorded as changes, since they may have
+        been written before the watch on their directory existed.
+        """
+        prefix = "" if top == self.target_dir else self._relpath(top) + "/"
+        for directory, _ in walk_files(top, self.ignore, True, prefix):
+            self._inotify.add_watch(directory)
+        if report_files:
+            for path, _ in walk_files(top, self.ignore, rel_prefix=prefix):
+                self._record_change(path)
+
+    def verify(self, rehash: bool = True, compare: bool = True) -> Set[str]:
+        """
+        Re-scans the tree against the content index and records any files
+        whose digest differs. With rehash=False, files whose inode, size and
+        mtime are unchanged keep their cached digest.
+        """
+        if self.index is None:
+            return set()
+        entries, dir_digests = self.index.scan(
+            self.target_dir, walk_files(self.target_dir, self.ignore), rehash=rehash
+        )
+        changed = (
+            self.index.diff(self.target_dir, entries, dir_digests) if compare else set()
+        )
+        for path in changed:
+            self._record_change(path)
+        self.index.update(entries, dir_digests)
+        self.index.save()
+        return changed
+
+    def _record_change(self, path: str):
+        with self._lock:
+            self.changes.add(path)
+
+    def _watch_loop(self):
+        inotify = self._inotify
+        while not self._stop.is_set():
+            try:
+                ready, _, _ = select.select([inotify.fd], [], [], 0.5)
+                if not ready:
                     continue
-                path = os.path.join(root, file)
+                for watch_path, mask, name in inotify.read_events():
+                    self._handle_event(watch_path, mask, name)
+            except (OSError, ValueError):
+                # fd closed underneath us by close()
+                return
+
+    def _handle_event(self, watch_path: str, mask: int, name):
+        if mask & IN_Q_OVERFLOW:
+            # Events were dropped, so we can no longer vouch for the tree.
+            self._record_change(self.target_dir)
+            return
+
+        if name is None:
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                self._record_change(watch_path)
+            return
+
+        path = os.path.join(watch_path, name)
+        is_dir = bool(mask & IN_ISDIR)
+        if self.ignore.match(self._relpath(path), is_dir=is_dir):
+            return
+
+        if is_dir:
+            if mask & (IN_CREATE | IN_MOVED_TO):
                 try:
-                    self.file_snapshot[path] = os.path.getmtime(path)
+                    self._watch_tree(path, report_files=True)
                 except OSError:
-                    pass
+                    self._record_change(path)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self._record_change(path)
+            return
+
+        self._record_change(path)
+
+    def close(self):
+        """Stops the background watcher, if any."""
+        self._stop_watching()
+
+    # --- threat scoring ---
 
     def check_threat(self) -> float:
         """Checks if any file has been modified since snapshot."""
+        if self.changes:
+            return 1.0
+        if self._inotify is not None:
+            # The watcher thread keeps the change set current, so this is O(1).
+            return 0.0
+
+        return self._poll_threat()
+
+    def _poll_threat(self) -> float:
+        """Fallback: walks the tree and compares against the mtime snapshot."""
         changes_detected = 0
         current_files = set()
 
-        for root, _, files in os.walk(self.target_dir):
-            if "__pycache__" in root or ".git" in root or ".venv" in root:
-                continue
-            for file in files:
-                if file.endswith(".pyc"):
-                    continue
-                path = os.path.join(root, file)
-                current_files.add(path)
-                try:
-                    mtime = os.path.getmtime(path)
-
-                    # Check modification
-                    if path in self.file_snapshot:
-                        if self.file_snapshot[path] != mtime:
-                            # File modified
-                            changes_detected += 1
-                    else:
-                        # New file
-                        changes_detected += 1
-                except OSError:
-                    pass
+        for path, st in walk_files(self.target_dir, self.ignore):
+            current_files.add(path)
+            if path in self.file_snapshot:
+                if self.file_snapshot[path] != st.st_mtime:
+                    # File modified
+                    changes_detected += 1
+            else:
+                # New file
+                changes_detected += 1
 
         # Check for deletions
         for path in self.file_snapshot:
@@ -1,31 +1,64 @@
 import sys
 import select
+import threading
 import termios
 import tty
 from hashfi.sensors.base import BaseSensor
 
 
 class KeyboardPanicSensor(BaseSensor):
-    def __init__(self):
+    def __init__(self, stream=None):
         super().__init__(
-            name="Keyboard Panic", weight=10.0
-        )  # High weight to trigger immediately
+            name="Keyboard Panic", weight=10.0, interval=0.0, timeout=1.0, critical=True
+        )  # High weight to trigger immediately, polled on every tick
+        self.stream = stream or sys.stdin
         self.triggered = False
+        self._listener = None
+        self._stop = threading.Event()
 
     def check_threat(self) -> float:
         if self.triggered:
             return 1.0
+        if self._listener is not None:
+            # The listener thread owns the stream and pushes the panic itself.
+            return 0.0
 
         # Check for input without blocking
         if self.is_data():
-            c = sys.stdin.read(1)
+            c = self.stream.read(1)
             if c == "p":  # 'p' for PANIC
                 self.triggered = True
                 return 1.0
         return 0.0
 
     def is_data(self):
-        return select.select([sys.stdin], [], [], 0) == ([sys.stdin], [], [])
+        return select.select([self.stream], [], [], 0) == ([self.stream], [], [])
+
+    def start(self):
+        """Listens for the panic key on a thread and pushes it immediately."""
+        if self._listener is None:
+            self._stop.clear()
+            self._listener = threading.Thread(target=self._listen, daemon=True)
+            self._listener.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.join(timeout=1)
+            self._listener = None
+
+    def _listen(self):
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self.stream], [], [], 0.2)
+            if not ready:
+                continue
+            c = self.stream.read(1)
+            if c == "":
+                return  # EOF
+            if c == "p":  # 'p' for PANIC
+                self.triggered = True
+                self.report(1.0)
 
     def reset(self):
         self.triggered = False
+        self.report(0.0)  # Clear the score cached by the monitor
@@ -0,0 +1,28 @@
+import signal
+from hashfi.sensors.base import BaseSensor
+
+
+class SignalPanicSensor(BaseSensor):
+    """Turns a POSIX signal (SIGUSR1 by default) into an immediate panic."""
+
+    def __init__(self, signum: int = signal.SIGUSR1):
+        super().__init__(
+            name="Signal Panic", weight=10.0, interval=1.0, timeout=1.0, critical=True
+        )
+        self.signum = signum
+        self.triggered = False
+
+    def install(self):
+        """Installs the handler. Must be called from the main thread."""
+        signal.signal(self.signum, self._handle)
+
+    def _handle(self, signum, frame):
+        self.triggered = True
+        self.report(1.0)
+
+    def check_threat(self) -> float:
+        return 1.0 if self.triggered else 0.0
+
+    def reset(self):
+        self.triggered = False
+        self.report(0.0)  # Clear the score cached by the monitor
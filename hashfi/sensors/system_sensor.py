@@ -1,17 +1,32 @@
 import psutil
 import random
+from typing import Optional
 from hashfi.sensors.base import BaseSensor
+from hashfi.core.telemetry import TelemetrySampler
 
 
 class SystemSensor(BaseSensor):
-    def __init__(self):
-        super().__init__(name="System Telemetry", weight=1.0)
+    def __init__(self, sampler: Optional[TelemetrySampler] = None):
+        super().__init__(name="System Telemetry", weight=1.0, interval=1.0, timeout=2.0)
+        # With a shared sampler the sensor reads cached metrics instead of
+        # blocking 100 ms on its own CPU sample.
+        self.sampler = sampler
 
     def check_threat(self) -> float:
         threat = 0.0
 
+        if self.sampler is not None:
+            reading = self.sampler.latest()
+            cpu_percent = reading["cpu_percent"] or 0.0
+            connections = reading["net_connections"] or 0
+        else:
+            cpu_percent = psutil.cpu_percent(interval=0.1)
+            try:
+                connections = len(psutil.net_connections(kind="inet"))
+            except Exception:
+                connections = 0  # Permission denied or other error
+
         # 1. CPU Usage Check
-        cpu_percent = psutil.cpu_percent(interval=0.1)
         if cpu_percent > 80:
             threat += 0.4
         elif cpu_percent > 50:
@@ -19,14 +34,10 @@ class SystemSensor(BaseSensor):
 
         # 2. Network Connections Check
         # Count established connections
-        try:
-            connections = len(psutil.net_connections(kind="inet"))
-            if connections > 100:
-                threat += 0.3
-            elif connections > 50:
-                threat += 0.1
-        except Exception:
-            pass  # Permission denied or other error
+        if connections > 100:
+            threat += 0.3
+        elif connections > 50:
+            threat += 0.1
 
         # 3. Random Jitter (to simulate fluctuating threat levels for the demo)
         # In a real app, this would be specific heuristic checks
@@ -0,0 +1,270 @@
+import base64
+import os
+import struct
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+
+from hashfi.utils.secretbuffer import SecretBuffer
+
+# Raw record layout: version, algorithm id, key id, 12-byte nonce, then
+# ciphertext with its 16-byte tag. The header is authenticated as
+# associated data. Version 1 records have no key id and belong to key 0.
+RECORD_VERSION = 2
+HEADER = struct.Struct(">BB")
+KEYED_HEADER = struct.Struct(">BBH")
+NONCE_SIZE = 12
+
+# Fernet tokens are base64 text and always start with "g" (version 0x80).
+FERNET_PREFIX = b"g"
+
+BACKENDS: Dict[str, int] = {"aes-gcm": 1, "chacha20": 2}
+_AEADS = {1: AESGCM, 2: ChaCha20Poly1305}
+DEFAULT_BACKEND = "aes-gcm"
+
+Key = Union[bytes, SecretBuffer]
+Buffer = Union[bytes, memoryview]
+
+
+def _raw_key(key: Key):
+    """32 raw key bytes, from raw bytes, a Fernet-style base64 key or a buffer."""
+    data = key.view if isinstance(key, SecretBuffer) else key
+    if len(data) == 44:
+        return base64.urlsafe_b64decode(bytes(data))
+    if len(data) != 32:
+        raise ValueError("Vault key must be 32 raw or 44 base64 bytes")
+    return data
+
+
+# Streamed items are sealed in STREAM_CHUNK_SIZE pieces. The stream header
+# is version, algorithm id, key id (version 3 only) and a random 7-byte
+# nonce prefix; chunk i uses nonce prefix + i + a final-chunk flag, so
+# chunks cannot be reordered, dropped or the stream cut short without
+# failing authentication. Vault items are version 3; version 2 streams,
+# as in backup archives, carry no key id.
+STREAM_VERSION = 2
+KEYED_STREAM_VERSION = 3
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_PREFIX_SIZE = 7
+STREAM_HEADER_SIZE = HEADER.size + STREAM_PREFIX_SIZE
+KEYED_STREAM_HEADER_SIZE = KEYED_HEADER.size + STREAM_PREFIX_SIZE
+_CHUNK_NONCE = struct.Struct(">7sIB")
+
+
+def _parse_header(header, keyed_version: int) -> Tuple[int, int, int, int]:
+    """(version, algorithm id, key id, header size) of a record or stream."""
+    version, algo = HEADER.unpack_from(header)
+    if version == keyed_version:
+        return version, algo, KEYED_HEADER.unpack_from(header)[2], KEYED_HEADER.size
+    return version, algo, 0, HEADER.size
+
+
+class StreamSealer:
+    """Seals one streamed item chunk by chunk with a single AEAD key."""
+
+    def __init__(self, aead, algo: int, key_id: Optional[int] = None):
+        self._aead = aead
+        if key_id is None:
+            prefix = HEADER.pack(STREAM_VERSION, algo)
+        else:
+            prefix = KEYED_HEADER.pack(KEYED_STREAM_VERSION, algo, key_id)
+        self.key_id = key_id or 0
+        self.header = prefix + os.urandom(STREAM_PREFIX_SIZE)
+        self._prefix = self.header[len(prefix) :]
+        self._index = 0
+
+    def seal(self, chunk, last: bool = False) -> bytes:
+        nonce = _CHUNK_NONCE.pack(self._prefix, self._index, last)
+        self._index += 1
+        return self._aead.encrypt(nonce, chunk, self.header)
+
+
+class StreamChunker:
+    """
+    Cuts a byte stream into STREAM_CHUNK_SIZE chunks and seals them. The
+    tail is always held back, so close() can seal the last chunk as final.
+    """
+
+    def __init__(self, sealer: StreamSealer):
+        self.sealer = sealer
+        self._buffer = bytearray()
+
+    def feed(self, data) -> List[bytes]:
+        self._buffer += data
+        if len(self._buffer) <= STREAM_CHUNK_SIZE:
+            return []
+        full = (len(self._buffer) - 1) // STREAM_CHUNK_SIZE * STREAM_CHUNK_SIZE
+        sealed = [
+            self.sealer.seal(self._buffer[start : start + STREAM_CHUNK_SIZE])
+            for start in range(0, full, STREAM_CHUNK_SIZE)
+        ]
+        del self._buffer[:full]
+        return sealed
+
+    def close(self) -> bytes:
+        last, self._buffer = bytes(self._buffer), bytearray()
+        return self.sealer.seal(last, last=True)
+
+
+class StreamOpener:
+    """Opens the chunks sealed by a StreamSealer, given its header."""
+
+    def __init__(self, aeads, header):
+        header = bytes(header)
+        version, algo, _, size = _parse_header(header, KEYED_STREAM_VERSION)
+        if version not in (STREAM_VERSION, KEYED_STREAM_VERSION) or algo not in aeads:
+            raise ValueError(f"Unsupported vault stream {version}/{algo}")
+        if len(header) != size + STREAM_PREFIX_SIZE:
+            raise ValueError("Vault stream header is malformed")
+        self._aead = aeads[algo]
+        self._header = header
+        self._prefix = header[size:]
+        self._index = 0
+
+    def open(self, chunk, last: bool = False) -> bytes:
+        nonce = _CHUNK_NONCE.pack(self._prefix, self._index, last)
+        self._index += 1
+        return self._aead.decrypt(nonce, chunk, self._header)
+
+
+def stream_key_id(header) -> int:
+    return _parse_header(header, KEYED_STREAM_VERSION)[2]
+
+
+def record_key_id(record) -> Optional[int]:
+    """Key id of a raw record; None for Fernet tokens, which carry none."""
+    if record[:1] == FERNET_PREFIX:
+        return None
+    return _parse_header(record, RECORD_VERSION)[2]
+
+
+class VaultCipher:
+    """
+    Encrypts vault records with one backend and decrypts any of them.
+
+    "aes-gcm" and "chacha20" write raw binary records with a small versioned
+    header that names the key (key_id); "fernet" writes the original base64
+    Fernet tokens. Whatever the write backend, decrypt() recognises the
+    record type, so Fernet records from older sessions stay readable.
+    Plaintexts and ciphertexts are bytes, and decrypt() accepts memoryviews
+    without copying them.
+    """
+
+    def __init__(self, key: Key, backend: str = DEFAULT_BACKEND, key_id: int = 0):
+        if backend != "fernet" and backend not in BACKENDS:
+            raise ValueError(f"Unknown cipher backend '{backend}'")
+        raw = _raw_key(key)
+        self.backend = backend
+        self.key_id = key_id
+        self._aeads = {algo: cls(raw) for algo, cls in _AEADS.items()}
+        self._fernet = Fernet(base64.urlsafe_b64encode(raw))
+        if backend != "fernet":
+            self._algo = BACKENDS[backend]
+            self._header = KEYED_HEADER.pack(RECORD_VERSION, self._algo, key_id)
+
+    def encrypt(self, plaintext: bytes) -> bytes:
+        if self.backend == "fernet":
+            return self._fernet.encrypt(plaintext)
+        nonce = os.urandom(NONCE_SIZE)
+        sealed = self._aeads[self._algo].encrypt(nonce, plaintext, self._header)
+        return self._header + nonce + sealed
+
+    def sealer(self) -> StreamSealer:
+        """
+        Chunked encryption for one streamed item. Streams are always AEAD:
+        a "fernet" cipher seals them with the default backend.
+        """
+        algo = BACKENDS.get(self.backend, BACKENDS[DEFAULT_BACKEND])
+        return StreamSealer(self._aeads[algo], algo, self.key_id)
+
+    def decrypt_stream(self, pieces: Iterable[Buffer]) -> Iterator[bytes]:
+        """
+        Decrypts a stream stored as its header followed by sealed chunks,
+        yielding plaintext chunks. Reads one chunk ahead so the final one
+        is opened as final, which catches truncation.
+        """
+        pieces = iter(pieces)
+        header = next(pieces, None)
+        if header is None:
+            raise ValueError("Vault stream has no header")
+        yield from self._open_stream(header, pieces)
+
+    def _open_stream(self, header: Buffer, pieces: Iterator[Buffer]):
+        opener = StreamOpener(self._aeads, header)
+        current = next(pieces, None)
+        if current is None:
+            raise ValueError("Vault stream is empty")
+        for following in pieces:
+            yield opener.open(current)
+            current = following
+        yield opener.open(current, last=True)
+
+    def decrypt(self, record: Union[bytes, memoryview]) -> bytes:
+        record = memoryview(record)
+        if record[:1] == FERNET_PREFIX:
+            return self._fernet.decrypt(bytes(record))
+        version, algo, _, size = _parse_header(record, RECORD_VERSION)
+        if version not in (1, RECORD_VERSION) or algo not in self._aeads:
+            raise ValueError(f"Unsupported vault record {version}/{algo}")
+        start = size + NONCE_SIZE
+        nonce = record[size:start]
+        return self._aeads[algo].decrypt(nonce, record[start:], record[:size])
+
+
+class KeyRing:
+    """
+    The vault's ciphers by key id, for key rotation. Encrypts with the
+    current cipher and decrypts each record or stream with the cipher its
+    key id names, so records under the old and the new key can be read
+    side by side while a rotation is under way. Fernet tokens carry no key
+    id, so a Fernet vault cannot be rotated; they go to the current cipher.
+    """
+
+    def __init__(self, cipher: VaultCipher):
+        self.current = cipher
+        self._ciphers: Dict[int, VaultCipher] = {cipher.key_id: cipher}
+
+    @property
+    def backend(self) -> str:
+        return self.current.backend
+
+    @property
+    def key_ids(self) -> List[int]:
+        return list(self._ciphers)
+
+    def add(self, cipher: VaultCipher, current: bool = True):
+        """Adds cipher and, if current, makes it the one new records use."""
+        # Copy on write: readers on other threads never see a dict mid-update.
+        self._ciphers = {**self._ciphers, cipher.key_id: cipher}
+        if current:
+            self.current = cipher
+
+    def retire(self, key_id: int):
+        if key_id == self.current.key_id:
+            raise ValueError("Cannot retire the current key")
+        self._ciphers = {k: c for k, c in self._ciphers.items() if k != key_id}
+
+    def _cipher(self, key_id: int) -> VaultCipher:
+        cipher = self._ciphers.get(key_id)
+        if cipher is None:
+            raise ValueError(f"Vault key {key_id} is not available")
+        return cipher
+
+    def encrypt(self, plaintext: bytes) -> bytes:
+        return self.current.encrypt(plaintext)
+
+    def sealer(self) -> StreamSealer:
+        return self.current.sealer()
+
+    def decrypt(self, record: Union[bytes, memoryview]) -> bytes:
+        key_id = record_key_id(record)
+        cipher = self.current if key_id is None else self._cipher(key_id)
+        return cipher.decrypt(record)
+
+    def decrypt_stream(self, pieces: Iterable[Buffer]) -> Iterator[bytes]:
+        pieces = iter(pieces)
+        header = next(pieces, None)
+        if header is None:
+            raise ValueError("Vault stream has no header")
+        return self._cipher(stream_key_id(header))._open_stream(header, pieces)
@@ -1,7 +1,13 @@
+import ctypes
 import hashlib
 import secrets
 import base64
+from typing import Union
 from cryptography.fernet import Fernet
+from hashfi.utils.ciphers import DEFAULT_BACKEND, KeyRing, VaultCipher
+from hashfi.utils.secretbuffer import SecretBuffer
+
+KeyMaterial = Union[bytes, SecretBuffer, VaultCipher, KeyRing, Fernet]
 
 
 def generate_salt(length: int = 16) -> str:
@@ -15,8 +21,24 @@ def generate_session_hash(salt: str, entropy: str) -> str:
     return hashlib.sha256(data).hexdigest()
 
 
-def derive_key(session_hash: str) -> bytes:
-    """Derives a Fernet-compatible key from the session hash."""
+def generate_session_secret(salt: str, entropy: str) -> SecretBuffer:
+    """Like generate_session_hash, but the raw digest in a SecretBuffer."""
+    return SecretBuffer.from_bytes(hashlib.sha256(f"{salt}{entropy}".encode()).digest())
+
+
+def derive_key(
+    session_hash: Union[str, SecretBuffer], salt: bytes = b""
+) -> Union[bytes, SecretBuffer]:
+    """
+    Derives the vault key from the session hash. A SecretBuffer in gives
+    the raw 32-byte key in a SecretBuffer out, hashed straight from its
+    memory (with salt, if given, for rotated keys); a str gives a
+    Fernet-style base64 key as before. Both work with make_cipher.
+    """
+    if isinstance(session_hash, SecretBuffer):
+        h = hashlib.sha256(session_hash.view)
+        h.update(salt)
+        return SecretBuffer.from_bytes(h.digest())
     # Fernet requires a 32-byte url-safe base64-encoded key.
     # We take the SHA256 of the session hash (which is already hex) to get 32 bytes,
     # then base64 encode it.
@@ -24,19 +46,37 @@ def derive_key(session_hash: str) -> bytes:
     return base64.urlsafe_b64encode(digest)
 
 
-def encrypt_data(key: bytes, plaintext: str) -> bytes:
-    """Encrypts plaintext using the provided key."""
-    f = Fernet(key)
-    return f.encrypt(plaintext.encode())
+def make_cipher(
+    key: Union[bytes, SecretBuffer], backend: str = DEFAULT_BACKEND, key_id: int = 0
+) -> VaultCipher:
+    """Builds a reusable cipher for key, so callers can skip per-call setup."""
+    return VaultCipher(key, backend, key_id)
+
+
+def _cipher(key: KeyMaterial) -> Union[VaultCipher, KeyRing, Fernet]:
+    if isinstance(key, (VaultCipher, KeyRing, Fernet)):
+        return key
+    return VaultCipher(key)
+
+
+def encrypt_data(key: KeyMaterial, plaintext: Union[str, bytes]) -> bytes:
+    """Encrypts plaintext using the provided key or prebuilt cipher."""
+    if isinstance(plaintext, str):
+        plaintext = plaintext.encode()
+    return _cipher(key).encrypt(plaintext)
 
 
-def decrypt_data(key: bytes, ciphertext: bytes) -> str:
-    """Decrypts ciphertext using the provided key."""
-    f = Fernet(key)
+def decrypt_data(key: KeyMaterial, ciphertext: Union[bytes, memoryview]) -> str:
+    """Decrypts ciphertext using the provided key or prebuilt cipher."""
+    f = _cipher(key)
+    if isinstance(f, Fernet) and not isinstance(ciphertext, bytes):
+        ciphertext = bytes(ciphertext)  # Fernet only takes bytes tokens
     return f.decrypt(ciphertext).decode()
 
 
-def secure_wipe(data: bytearray):
-    """Overwrites a bytearray with zeros."""
-    for i in range(len(data)):
-        data[i] = 0
+def secure_wipe(data: Union[bytearray, memoryview, SecretBuffer]):
+    """Overwrites a bytearray (or writable buffer) with zeros in one memset."""
+    if isinstance(data, SecretBuffer):
+        data.wipe()
+    elif len(data):
+        ctypes.memset((ctypes.c_char * len(data)).from_buffer(data), 0, len(data))
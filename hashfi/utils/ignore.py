@@ -0,0 +1,157 @@
+import os
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Used when no patterns are configured and the tree has no .hashfiignore.
+DEFAULT_IGNORE_PATTERNS = [
+    "__pycache__/",
+    ".git/",
+    ".venv/",
+    "*.pyc",
+]
+
+IGNORE_FILE_NAME = ".hashfiignore"
+
+
+def _translate(pattern: str) -> str:
+    """Translates one gitignore glob into a regex body (no anchors)."""
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern[i : i + 3] == "**/":
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern[i : i + 2] == "**":
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pattern.find("]", i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1 : j]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """
+    Compiled gitignore-style matcher.
+
+    Supports `*`, `?`, `[...]`, `**`, trailing `/` for directory-only rules,
+    a leading or inner `/` to anchor a rule to the root, and `!` negation.
+    Paths are matched relative to the root using `/` separators.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = []
+        self._rules: List[Tuple[re.Pattern, bool, bool]] = []
+        for raw in patterns:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            self.patterns.append(line)
+
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if "/" in line:
+                regex = "^" + _translate(line.lstrip("/")) + "$"
+            else:
+                regex = "^(?:.*/)?" + _translate(line) + "$"
+            self._rules.append((re.compile(regex), dir_only, negate))
+
+        # Without negations the last-match-wins walk is unnecessary, so fold
+        # everything into two alternations and match each path once.
+        self._fast = not any(negate for _, _, negate in self._rules)
+        if self._fast:
+            self._any = self._combine(r for r, dir_only, _ in self._rules)
+            self._files = self._combine(
+                r for r, dir_only, _ in self._rules if not dir_only
+            )
+
+    @staticmethod
+    def _combine(regexes) -> Optional[re.Pattern]:
+        bodies = [f"(?:{r.pattern})" for r in regexes]
+        return re.compile("|".join(bodies)) if bodies else None
+
+    @classmethod
+    def for_tree(cls, root: str, patterns: Optional[Iterable[str]] = None):
+        """
+        Builds rules for root: explicit patterns win, then root/.hashfiignore,
+        then DEFAULT_IGNORE_PATTERNS.
+        """
+        if patterns is not None:
+            return cls(patterns)
+        path = os.path.join(root, IGNORE_FILE_NAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(f.read().splitlines())
+        except OSError:
+            return cls(DEFAULT_IGNORE_PATTERNS)
+
+    def match(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Returns True if rel_path (relative to the root) is ignored."""
+        if self._fast:
+            compiled = self._any if is_dir else self._files
+            return bool(compiled and compiled.match(rel_path))
+
+        ignored = False
+        for regex, dir_only, negate in self._rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                ignored = not negate
+        return ignored
+
+
+def walk_files(
+    root: str, rules: IgnoreRules, dirs_only: bool = False, rel_prefix: str = ""
+) -> Iterator[Tuple[str, Optional[os.stat_result]]]:
+    """
+    Yields (path, stat_result) for every non-ignored file under root.
+    Ignored directories are pruned before they are opened, and directory
+    detection uses the d_type from scandir, so each file is stat'ed once.
+    With dirs_only set, yields (dir_path, None) for each kept directory instead.
+    rel_prefix is root's own path relative to the rules' root, if it differs.
+    """
+    stack = [(root, rel_prefix)]
+    while stack:
+        top, rel_top = stack.pop()
+        if dirs_only:
+            yield top, None
+        try:
+            it = os.scandir(top)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                rel = f"{rel_top}{entry.name}"
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if rules.match(rel, is_dir=is_dir):
+                    continue
+                if is_dir:
+                    stack.append((entry.path, rel + "/"))
+                elif not dirs_only:
+                    try:
+                        yield entry.path, entry.stat(follow_symlinks=False)
+                    except OSError:
+                        pass
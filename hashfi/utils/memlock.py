@@ -0,0 +1,35 @@
+import ctypes
+import ctypes.util
+import os
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    _libc.mlock.argtypes = (ctypes.c_void_p, ctypes.c_size_t)
+    _libc.munlock.argtypes = (ctypes.c_void_p, ctypes.c_size_t)
+except (OSError, AttributeError, TypeError):
+    _libc = None  # No libc mlock (e.g. Windows)
+
+
+def _address(buffer) -> int:
+    # from_buffer only pins the buffer while the ctypes object is alive.
+    return ctypes.addressof(ctypes.c_char.from_buffer(buffer))
+
+
+def lock_pages(buffer) -> bool:
+    """
+    mlock()s a writable buffer (bytearray, mmap) so its pages are never
+    swapped out. Returns False where mlock is unavailable or refused, e.g.
+    when RLIMIT_MEMLOCK is too low.
+    """
+    if _libc is None or not len(buffer):
+        return False
+    if _libc.mlock(_address(buffer), len(buffer)) != 0:
+        err = ctypes.get_errno()
+        print(f"[memlock] mlock of {len(buffer)} bytes failed: {os.strerror(err)}")
+        return False
+    return True
+
+
+def unlock_pages(buffer):
+    if _libc is not None and len(buffer):
+        _libc.munlock(_address(buffer), len(buffer))
@@ -0,0 +1,103 @@
+import os
+from typing import Dict, Optional
+
+import psutil
+
+# Socket state codes from include/net/tcp_states.h, as psutil names them.
+TCP_STATES = {
+    "01": "ESTABLISHED",
+    "02": "SYN_SENT",
+    "03": "SYN_RECV",
+    "04": "FIN_WAIT1",
+    "05": "FIN_WAIT2",
+    "06": "TIME_WAIT",
+    "07": "CLOSE",
+    "08": "CLOSE_WAIT",
+    "09": "LAST_ACK",
+    "0A": "LISTEN",
+    "0B": "CLOSING",
+    "0C": "NEW_SYN_RECV",
+}
+
+PROC_NET_FILES = ("tcp", "tcp6", "udp", "udp6")
+
+# In /proc/net/{tcp,udp}* the state is the only space-delimited field that is
+# exactly two hex digits with a leading zero: addresses are longer, timer
+# fields contain ':' and uid/timeout/inode are decimal without leading zeros.
+# That lets bytes.count() tally states without splitting a single line.
+_STATE_TOKENS = {code: f" {code} ".encode() for code in TCP_STATES}
+
+
+class ConnectionCounts:
+    """Per-protocol, per-state socket counts from one sample."""
+
+    def __init__(self, counts: Dict[str, Dict[str, int]], source: str):
+        # {"tcp": {"ESTABLISHED": 12, ...}, "udp": {...}}
+        self.counts = counts
+        self.source = source
+
+    @property
+    def total(self) -> int:
+        return sum(sum(states.values()) for states in self.counts.values())
+
+    def by_state(self) -> Dict[str, int]:
+        """State counts summed over all protocols."""
+        merged: Dict[str, int] = {}
+        for states in self.counts.values():
+            for state, n in states.items():
+                merged[state] = merged.get(state, 0) + n
+        return merged
+
+    def diff(self, previous: Optional["ConnectionCounts"]) -> Dict[str, int]:
+        """Change in each state count since previous (non-zero deltas only)."""
+        now = self.by_state()
+        before = previous.by_state() if previous is not None else {}
+        deltas = {}
+        for state in set(now) | set(before):
+            delta = now.get(state, 0) - before.get(state, 0)
+            if delta:
+                deltas[state] = delta
+        return deltas
+
+
+def _count_proc_file(path: str) -> Dict[str, int]:
+    with open(path, "rb") as f:
+        data = f.read()
+    counts = {}
+    for code, token in _STATE_TOKENS.items():
+        n = data.count(token)
+        if n:
+            counts[TCP_STATES[code]] = n
+    return counts
+
+
+def _count_psutil() -> ConnectionCounts:
+    counts: Dict[str, Dict[str, int]] = {}
+    for conn in psutil.net_connections(kind="inet"):
+        proto = "tcp" if conn.type == 1 else "udp"  # socket.SOCK_STREAM == 1
+        # psutil reports unconnected UDP as NONE; /proc calls that CLOSE.
+        state = conn.status if conn.status != "NONE" else "CLOSE"
+        bucket = counts.setdefault(proto, {})
+        bucket[state] = bucket.get(state, 0) + 1
+    return ConnectionCounts(counts, source="psutil")
+
+
+def count_connections(proc_root: str = "/proc/net") -> ConnectionCounts:
+    """
+    Counts inet sockets by protocol and state. Reads /proc/net directly
+    where available and falls back to psutil elsewhere.
+    """
+    if os.path.isfile(os.path.join(proc_root, "tcp")):
+        counts: Dict[str, Dict[str, int]] = {}
+        for name in PROC_NET_FILES:
+            path = os.path.join(proc_root, name)
+            try:
+                per_state = _count_proc_file(path)
+            except OSError:
+                continue  # e.g. IPv6 disabled
+            proto = name.rstrip("6")
+            bucket = counts.setdefault(proto, {})
+            for state, n in per_state.items():
+                bucket[state] = bucket.get(state, 0) + n
+        return ConnectionCounts(counts, source="proc")
+    return _count_psutil()
@@ -0,0 +1,81 @@
+import ctypes
+from typing import Union
+
+from hashfi.utils.memlock import lock_pages, unlock_pages
+
+
+class SecretBuffer:
+    """
+    Fixed-size mutable home for key material.
+
+    The bytes are allocated once, mlock()ed where the OS allows it so they
+    never reach swap, handed out only as memoryviews, and zeroed with a
+    single memset by wipe(), on exit from a with block, or when the buffer
+    is collected. Unlike str and bytes, nothing here is copied behind the
+    caller's back, so the wipe actually reaches the only copy.
+    """
+
+    def __init__(self, size: int, lock: bool = True):
+        self._data = bytearray(size)
+        # Keeping an export alive stops the bytearray from ever being
+        # resized, i.e. moved away from the locked, wipeable address.
+        self._view = memoryview(self._data)
+        self._pin = (ctypes.c_char * size).from_buffer(self._data) if size else None
+        self.locked = bool(size) and lock and lock_pages(self._data)
+        self._wiped = False
+
+    @classmethod
+    def from_bytes(
+        cls, data: Union[bytes, bytearray, memoryview, str], lock: bool = True
+    ) -> "SecretBuffer":
+        """Copies data in. The caller should drop (or wipe) its own copy."""
+        if isinstance(data, str):
+            data = data.encode()
+        buffer = cls(len(data), lock)
+        buffer._view[:] = data
+        return buffer
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __bool__(self) -> bool:
+        return not self._wiped and len(self._data) > 0
+
+    @property
+    def wiped(self) -> bool:
+        return self._wiped
+
+    @property
+    def view(self) -> memoryview:
+        if self._wiped:
+            raise ValueError("SecretBuffer has been wiped")
+        return self._view
+
+    def hex(self) -> str:
+        """Hex of the contents as an ordinary str, for display only."""
+        return self.view.hex()
+
+    def wipe(self):
+        if self._wiped:
+            return
+        if self._pin is not None:
+            ctypes.memset(self._pin, 0, len(self._data))
+            if self.locked:
+                unlock_pages(self._data)
+        self._wiped = True
+
+    def __enter__(self) -> "SecretBuffer":
+        return self
+
+    def __exit__(self, *exc):
+        self.wipe()
+
+    def __del__(self):
+        try:
+            self.wipe()
+        except Exception:
+            pass  # Interpreter shutdown
+
+    def __repr__(self) -> str:
+        state = "wiped" if self._wiped else f"{len(self._data)} bytes"
+        return f"<SecretBuffer {state}>"
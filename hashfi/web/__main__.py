@@ -0,0 +1,7 @@
+# `python -m hashfi.web` runs the dashboard. Launched this way the main
+# module is a package __main__, which multiprocessing does not re-import in
+# stegano workers, so they never load the web app at all.
+from hashfi.web.app import start
+
+if __name__ == "__main__":
+    start()
@@ -1,5 +1,6 @@
 from fastapi import (
     FastAPI,
+    Query,
     Request,
     HTTPException,
     UploadFile,
@@ -7,24 +8,44 @@ from fastapi import (
     Form,
     BackgroundTasks,
 )
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
+from typing import List, Optional
 import uvicorn
+import asyncio
+import json
+import secrets
+from collections import OrderedDict
+from functools import partial
+from itertools import islice
 import threading
 import time
 import os
-from datetime import datetime
-import psutil
 from faker import Faker
 import subprocess
 from hashfi.core.session import SessionManager
 from hashfi.core.monitor import ThreatMonitor
+from hashfi.core.telemetry import TelemetrySampler
 from hashfi.sensors.system_sensor import SystemSensor
 from hashfi.sensors.file_sensor import FileIntegritySensor
-from hashfi.core.stegano import encode_lsb, decode_lsb
-from hashfi.core.shredder import secure_shred
+from hashfi.sensors.signal_sensor import SignalPanicSensor
+from hashfi.core.stegano import encode_lsb_file, decode_lsb_file
+from hashfi.core.shredder import ShredProgress, shred_tree
+from hashfi.utils.ciphers import STREAM_CHUNK_SIZE
+from hashfi.web.events import EventBroadcaster
+from hashfi.web.logstore import LogStore
+from hashfi.web.uploads import MultipartFileStream
+from hashfi.web.jobs import (
+    IOPool,
+    JobPool,
+    JobQueueFull,
+    JobTimeout,
+    spool_upload,
+    remove_quietly,
+)
 
 app = FastAPI()
 fake = Faker()
@@ -60,7 +81,18 @@ async def spread_the_word(background_tasks: BackgroundTasks):
 
 
 class ShredRequest(BaseModel):
-    file_path: str
+    file_path: Optional[str] = None
+    # Files and/or directory trees, shredded in parallel
+    paths: List[str] = []
+    passes: int = 3
+    # false: return a job id at once and poll /api/tools/shred/{job}
+    wait: bool = True
+
+
+# Progress of recent shred jobs by id; the oldest is dropped past the limit
+shred_jobs: "OrderedDict[str, ShredProgress]" = OrderedDict()
+SHRED_JOBS_KEPT = 20
+shred_runs = set()
 
 
 # Secure File Shredder API
@@ -69,15 +101,59 @@ async def shred_file(request: ShredRequest):
     record_activity()
     if not session_manager.is_active:
         raise HTTPException(status_code=400, detail="Session burned")
-    file_path = request.file_path
-    if not os.path.isfile(file_path):
+    paths = request.paths + ([request.file_path] if request.file_path else [])
+    if not paths:
+        raise HTTPException(status_code=400, detail="No paths given")
+    if not any(os.path.lexists(path) for path in paths):
         raise HTTPException(status_code=404, detail="File not found")
-    success = secure_shred(file_path)
-    if success:
-        add_log(f"File '{file_path}' securely shredded.", "CRITICAL")
-        return {"status": "shredded"}
-    else:
+
+    job_id = secrets.token_hex(8)
+    progress = ShredProgress(request.passes)
+    for path in paths:
+        if not os.path.lexists(path):
+            progress.fail(path)
+    shred_jobs[job_id] = progress
+    while len(shred_jobs) > SHRED_JOBS_KEPT:
+        shred_jobs.popitem(last=False)
+
+    async def run():
+        try:
+            await vault_io.run(
+                partial(
+                    shred_tree, paths, request.passes, SHRED_WORKERS, progress=progress
+                )
+            )
+        except Exception as e:
+            # shred_tree has already marked the job finished; make sure a
+            # background run does not fail silently.
+            add_log(f"Shred job {job_id} failed: {e}", "CRITICAL")
+            raise
+        level = "CRITICAL" if progress.shredded else "WARNING"
+        add_log(
+            f"Shredded {progress.shredded} of {progress.files_total} file(s).", level
+        )
+        for path in progress.failed:
+            add_log(f"Failed to shred '{path}'.", "WARNING")
+
+    if not request.wait:
+        task = asyncio.create_task(run())
+        shred_runs.add(task)  # Keep a reference until it finishes
+        task.add_done_callback(shred_runs.discard)
+        return {"status": "started", "job": job_id}
+
+    await run()
+    if progress.failed and not progress.shredded:
         raise HTTPException(status_code=500, detail="Failed to shred file")
+    status = "partial" if progress.failed else "shredded"
+    return {"status": status, "job": job_id, **progress.as_dict()}
+
+
+@app.get("/api/tools/shred/{job_id}")
+async def shred_status(job_id: str):
+    progress = shred_jobs.get(job_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Unknown shred job")
+    return progress.as_dict()
 
 
 class SecretItem(BaseModel):
@@ -85,6 +161,13 @@ class SecretItem(BaseModel):
     content: str
 
 
+# Secrets stored per SessionManager call when importing NDJSON batches
+VAULT_BATCH_SIZE = 256
+# Longest NDJSON line accepted, so a body without newlines cannot grow the
+# pending buffer without bound
+VAULT_MAX_LINE = 4 * 1024 * 1024
+
+
 class IdentityRequest(BaseModel):
     service_name: str
 
@@ -100,15 +183,48 @@ templates = Jinja2Templates(directory=templates_dir)
 
 
 # Global State
-session_manager = SessionManager()
+# HASHFI_VAULT_STORAGE=segment keeps the vault in one append-only file;
+# HASHFI_SANDBOX=shm|memfd keeps it in RAM instead of under /tmp.
+session_manager = SessionManager(
+    storage=os.environ.get("HASHFI_VAULT_STORAGE", "directory"),
+    sandbox=os.environ.get("HASHFI_SANDBOX", "disk"),
+    lock_memory=os.environ.get("HASHFI_LOCK_MEMORY") == "1",
+    # Burns drop the key at once; the sandbox is then removed in the
+    # background, overwritten HASHFI_SHRED_ON_BURN times while the
+    # HASHFI_BURN_BUDGET (seconds) lasts and only unlinked after that.
+    shred_passes=int(os.environ.get("HASHFI_SHRED_ON_BURN", 0)),
+    teardown_budget=float(os.environ.get("HASHFI_BURN_BUDGET", 5)),
+    # Vault record cipher: aes-gcm (default), chacha20 or fernet
+    cipher=os.environ.get("HASHFI_CIPHER", "aes-gcm"),
+    # Key rotation worker threads; defaults to one per core
+    rotate_workers=int(os.environ.get("HASHFI_ROTATE_WORKERS", 0)) or None,
+)
+# One sampler feeds both the SystemSensor and /api/status, so psutil cost
+# does not grow with the number of open dashboards.
+telemetry = TelemetrySampler(interval=1.0)
 monitor = ThreatMonitor(threshold=0.9)
-monitor.add_sensor(SystemSensor())
-# Monitor the project root for unauthorized changes (skip in serverless)
+monitor.add_sensor(SystemSensor(sampler=telemetry))
 is_serverless = os.environ.get("VERCEL") or os.environ.get("AWS_LAMBDA_FUNCTION_NAME")
-if not is_serverless:
-    monitor.add_sensor(FileIntegritySensor(target_dir=project_root))
 
-logs = []
+logs = LogStore(capacity=int(os.environ.get("HASHFI_LOG_CAPACITY", 1000)))
+events = EventBroadcaster()
+
+# CPU-bound stegano work runs in its own process pool so a large image never
+# stalls the event loop (and with it /api/status or /api/panic).
+stegano_jobs = JobPool(
+    max_workers=int(os.environ.get("HASHFI_STEGANO_WORKERS", 2)),
+    max_queue=int(os.environ.get("HASHFI_STEGANO_QUEUE", 8)),
+    timeout=float(os.environ.get("HASHFI_STEGANO_TIMEOUT", 30)),
+)
+
+# Vault and shredder file I/O (writes, reads, fsync) plus the crypto around
+# it run here, keeping the event loop free for /api/status and /api/panic.
+vault_io = IOPool(
+    max_workers=int(os.environ.get("HASHFI_VAULT_IO_WORKERS", 4)), name="vault-io"
+)
+
+# Workers per shred job; each holds one 1 MiB overwrite buffer
+SHRED_WORKERS = int(os.environ.get("HASHFI_SHRED_WORKERS", 4))
 
 # Dead Man's Switch: triggers auto-panic after inactivity
 DEADMAN_TIMEOUT = 300  # seconds (5 minutes)
@@ -129,15 +245,44 @@ def deadman_loop():
                     "Dead Man's Switch: Inactivity detected. Auto-panic triggered.",
                     "CRITICAL",
                 )
-                session_manager.burn_session()
+                session_manager.burn_session(wait=False)
+                events.publish("burn", {"reason": "deadman"})
+                publish_status()
         time.sleep(5)
 
 
 def add_log(message, level="INFO"):
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    logs.append({"time": timestamp, "level": level, "message": message})
-    if len(logs) > 50:
-        logs.pop(0)
+    entry = logs.append(message, level)
+    events.publish("log", entry)
+
+
+def status_payload():
+    # Cool Feature: Network Connection Count (from the shared sampler)
+    net_connections = int(telemetry.latest()["net_connections"] or 0)
+
+    return {
+        "is_active": session_manager.is_active,
+        "hash": session_manager.get_hash(),
+        "sandbox": session_manager.get_sandbox(),
+        "threat_level": monitor.current_threat_level,
+        "sensors": monitor.get_sensor_status(),
+        "net_connections": net_connections,
+        "net_states": telemetry.connection_states(),
+    }
+
+
+last_published_status = None
+
+
+def publish_status():
+    """Pushes the status to stream subscribers, but only when it changed."""
+    global last_published_status
+    if not events.subscriber_count:
+        return
+    status = status_payload()
+    if status != last_published_status:
+        last_published_status = status
+        events.publish("status", status)
 
 
 def record_activity():
@@ -155,29 +300,101 @@ def monitor_loop():
                     f"Elevated Threat Level: {monitor.current_threat_level:.2f}",
                     "WARNING",
                 )
+        publish_status()
         time.sleep(1)
 
 
-# Start monitor in background thread (skip in serverless environments)
-is_serverless = os.environ.get("VERCEL") or os.environ.get("AWS_LAMBDA_FUNCTION_NAME")
-if not is_serverless:
-    monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
-    monitor_thread.start()
-    deadman_thread = threading.Thread(target=deadman_loop, daemon=True)
-    deadman_thread.start()
+background_started = False
+
+
+def start_background():
+    """
+    Adds the file integrity sensor and starts telemetry, the monitor and
+    the dead man's switch; called from the startup hook, never at import.
+    Process-pool workers re-import the launching module, and must not
+    repeat any of this.
+    """
+    global background_started
+    if background_started or is_serverless:
+        return
+    background_started = True
+    # Monitor the project root for unauthorized changes
+    monitor.add_sensor(
+        FileIntegritySensor(
+            target_dir=project_root,
+            # Optional persistent content index, e.g. /var/lib/hashfi/index.db
+            index_path=os.environ.get("HASHFI_INTEGRITY_INDEX"),
+            verify_content=os.environ.get("HASHFI_VERIFY_CONTENT") == "1",
+        )
+    )
+    telemetry.start()
+    threading.Thread(target=monitor_loop, daemon=True).start()
+    threading.Thread(target=deadman_loop, daemon=True).start()
 
 
 # Callback for auto-burn
 def on_breach():
     add_log("THREAT THRESHOLD BREACHED! AUTO-BURN INITIATED.", "CRITICAL")
-    session_manager.burn_session()
+    session_manager.burn_session(wait=False)
+    events.publish("burn", {"reason": "threat"})
+    publish_status()
 
 
 monitor.on_threshold_breach = on_breach
 
 
+def on_teardown_complete(report):
+    if report["complete"]:
+        add_log(f"Sandbox destroyed in {report['seconds']:.2f}s.", "INFO")
+    elif "error" in report:
+        add_log(f"Sandbox teardown failed: {report['error']}", "CRITICAL")
+    else:
+        add_log(f"Sandbox teardown left {report['failed']} behind.", "CRITICAL")
+    events.publish("teardown", report)
+
+
+session_manager.on_teardown_complete = on_teardown_complete
+
+
+def on_rotation_complete(report):
+    if report["complete"]:
+        add_log(
+            f"Vault key rotated to #{report['key_id']}: {report['rotated']} records "
+            f"re-encrypted in {report['seconds']:.2f}s.",
+            "INFO",
+        )
+    else:
+        add_log(f"Vault key rotation to #{report['key_id']} stopped.", "WARNING")
+    events.publish("rotation", report)
+
+
+session_manager.on_rotation_complete = on_rotation_complete
+
+
+def on_sensor_overrun(sensor):
+    add_log(
+        f"Sensor '{sensor.name}' exceeded its {sensor.timeout:.0f}s deadline.",
+        "WARNING",
+    )
+
+
+monitor.on_sensor_overrun = on_sensor_overrun
+
+
+# `kill -USR1 <pid>` burns the session without going through the poll loop
+signal_sensor = SignalPanicSensor()
+monitor.add_sensor(signal_sensor)
+
+
 @app.on_event("startup")
 async def startup_event():
+    events.bind(asyncio.get_running_loop())
+    start_background()
+    if not is_serverless:
+        try:
+            signal_sensor.install()
+        except ValueError:
+            pass  # Not running in the main thread (e.g. under a test client)
     try:
         add_log("System Startup. Initializing Session...", "INFO")
         session_manager.start_session()
@@ -187,6 +404,12 @@ async def startup_event():
         print(f"Startup error: {e}")  # For debugging
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    stegano_jobs.shutdown()
+    vault_io.shutdown()
+
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
@@ -195,31 +418,85 @@ async def read_root(request: Request):
 @app.get("/api/status")
 async def get_status():
     record_activity()
-    # Cool Feature: Network Connection Count
-    try:
-        net_connections = len(psutil.net_connections())
-    except Exception:
-        net_connections = 0  # Fallback for serverless environments
+    return status_payload()
 
-    return {
-        "is_active": session_manager.is_active,
-        "hash": session_manager.get_hash(),
-        "sandbox": session_manager.get_sandbox(),
-        "threat_level": monitor.current_threat_level,
-        "net_connections": net_connections,
-    }
+
+@app.get("/api/threat/history")
+async def threat_history(
+    sensor: str = "aggregate",
+    start: Optional[float] = Query(None, alias="from"),
+    end: Optional[float] = Query(None, alias="to"),
+    step: Optional[int] = Query(None, ge=1),
+):
+    """Threat scores over time for one sensor (or the aggregate)."""
+    record_activity()
+    end = time.time() if end is None else end
+    start = end - 3600 if start is None else start
+    result = monitor.history.query(sensor, start, end, step)
+    if result is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown sensor. Available: {monitor.history.names()}",
+        )
+    step, points = result
+    return {"sensor": sensor, "step": step, "points": points}
+
+
+@app.get("/api/stream")
+async def stream_events():
+    """Server-Sent Events: status changes, burns and new log entries."""
+    if is_serverless:
+        # No background monitor to feed the stream; clients fall back to polling.
+        raise HTTPException(status_code=503, detail="Streaming unavailable")
+    record_activity()
+
+    async def event_source():
+        # Start every viewer from a full snapshot, then only changes.
+        yield f"event: status\ndata: {json.dumps(status_payload())}\n\n"
+        # An open dashboard counts as activity for the Dead Man's Switch,
+        # just as its polling requests used to.
+        async for message in events.stream(on_heartbeat=record_activity):
+            yield message
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/api/logs")
-async def get_logs():
+async def get_logs(since: Optional[int] = None, limit: int = 50):
+    """
+    Newest `limit` entries, or only those after sequence id `since`. A
+    `since` ahead of the log (the server restarted) gets the newest
+    entries, with lower ids, which tells the client to start over.
+    """
     record_activity()
-    return logs
+    if since is not None and since > logs.last_seq:
+        since = None
+    return logs.since(since, limit=limit if since is None else None)
 
 
 @app.get("/api/vault")
-async def list_secrets():
+async def list_secrets(
+    prefix: str = "",
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    details: bool = False,
+):
+    """Lists secret names in order, optionally filtered and paginated."""
     record_activity()
-    return {"secrets": session_manager.get_secrets_list()}
+    names, total = session_manager.list_secrets(prefix, offset, limit)
+    response = {"secrets": names, "total": total, "offset": offset, "limit": limit}
+    if details:
+        items = []
+        for name in names:
+            info = session_manager.get_secret_info(name)
+            if info is not None:
+                items.append({"name": name, **info._asdict()})
+        response["items"] = items
+    return response
 
 
 @app.post("/api/vault")
@@ -228,7 +505,7 @@ async def store_secret(item: SecretItem):
     if not session_manager.is_active:
         raise HTTPException(status_code=400, detail="Session burned")
 
-    success = session_manager.store_secret(item.name, item.content)
+    success = await vault_io.run(session_manager.store_secret, item.name, item.content)
     if success:
         add_log(f"Secret '{item.name}' encrypted and stored in vault.", "INFO")
         return {"status": "stored"}
@@ -236,10 +513,204 @@ async def store_secret(item: SecretItem):
         raise HTTPException(status_code=500, detail="Failed to store secret")
 
 
+@app.post("/api/vault-ops/batch")
+async def store_secrets_batch(request: Request):
+    """
+    Stores many secrets from an NDJSON body, one {"name", "content"} object
+    per line. The body is parsed as it arrives and stored in small batches.
+    """
+    record_activity()
+    if not session_manager.is_active:
+        raise HTTPException(status_code=400, detail="Session burned")
+
+    stored, failed, batch = 0, [], []
+    pending = bytearray()  # Start of a line whose newline has not arrived
+    line_no = 0
+
+    async def flush():
+        nonlocal stored
+        count, errors = await vault_io.run(session_manager.store_secrets, list(batch))
+        stored += count
+        failed.extend(errors)
+        batch.clear()
+
+    def add(line: bytes):
+        nonlocal line_no
+        line_no += 1
+        if line.strip():
+            try:
+                batch.append(parse_secret_line(line))
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Bad NDJSON line {line_no}: {e} ({stored} secrets stored)",
+                )
+
+    async for chunk in request.stream():
+        # Only the new chunk is searched; earlier bytes have no newline.
+        lines = chunk.split(b"\n")
+        if len(lines) > 1:
+            pending += lines[0]
+            add(bytes(pending))
+            for line in lines[1:-1]:
+                add(line)
+            pending = bytearray(lines[-1])
+        else:
+            pending += chunk
+        if len(pending) > VAULT_MAX_LINE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"NDJSON line {line_no + 1} is over {VAULT_MAX_LINE} bytes "
+                f"({stored} secrets stored)",
+            )
+        if len(batch) >= VAULT_BATCH_SIZE:
+            await flush()
+    add(bytes(pending))
+    await flush()
+
+    add_log(f"Batch stored {stored} secrets in vault.", "INFO")
+    return {"status": "stored", "stored": stored, "failed": failed}
+
+
+def parse_secret_line(line: bytes):
+    """(name, content) from one NDJSON line; ValueError if it is not one."""
+    try:
+        item = SecretItem(**json.loads(line))
+    except (ValueError, TypeError) as e:
+        raise ValueError(str(e))
+    return item.name, item.content
+
+
+@app.get("/api/vault-ops/batch")
+async def retrieve_secrets_batch(names: List[str] = Query(None), prefix: str = ""):
+    """
+    Streams secrets as NDJSON, one {"name", "content"} object per line:
+    the listed names, or every secret matching prefix.
+    """
+    record_activity()
+    if not session_manager.is_active:
+        raise HTTPException(status_code=400, detail="Session burned")
+    if names is None:
+        names, _ = session_manager.list_secrets(prefix)
+
+    secrets_iter = session_manager.iter_secrets(names)
+
+    def next_chunk():
+        return "".join(
+            json.dumps({"name": name, "content": content}) + "\n"
+            for name, content in islice(secrets_iter, VAULT_BATCH_SIZE)
+        )
+
+    async def lines():
+        # Reads and decrypts a batch at a time on the vault I/O pool
+        while True:
+            chunk = await vault_io.run(next_chunk)
+            if not chunk:
+                break
+            yield chunk
+
+    add_log(f"Batch retrieved {len(names)} secrets from vault.", "WARNING")
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def vault_passphrase(request: Request) -> str:
+    # A header rather than the query string, which ends up in access logs
+    passphrase = request.headers.get("x-vault-passphrase", "")
+    if not passphrase:
+        raise HTTPException(status_code=400, detail="X-Vault-Passphrase required")
+    return passphrase
+
+
+@app.get("/api/vault-ops/export")
+async def export_vault(request: Request):
+    """
+    Streams the whole vault as one archive encrypted under the passphrase
+    in the X-Vault-Passphrase header. Restore it with /api/vault-ops/import.
+    """
+    record_activity()
+    passphrase = vault_passphrase(request)
+    archive = session_manager.export_vault(passphrase)
+    if archive is None:
+        raise HTTPException(status_code=400, detail="Session burned")
+
+    async def body():
+        # Each step decrypts records and seals a chunk on the vault I/O pool
+        while True:
+            piece = await vault_io.run(next, archive, None)
+            if piece is None:
+                break
+            if piece:
+                yield piece
+
+    add_log("Vault exported to an encrypted archive.", "WARNING")
+    return StreamingResponse(
+        body(),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": 'attachment; filename="hashfi_vault.hfx"'},
+    )
+
+
+@app.post("/api/vault-ops/import")
+async def import_vault(request: Request):
+    """
+    Restores an /api/vault-ops/export archive sent as the raw request body,
+    authenticating each chunk as it arrives.
+    """
+    record_activity()
+    passphrase = vault_passphrase(request)
+    restore = session_manager.import_vault(passphrase)
+    if restore is None:
+        raise HTTPException(status_code=400, detail="Session burned")
+
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await vault_io.run(restore.feed, chunk)
+        stored, failed = await vault_io.run(restore.finish)
+    except ValueError as e:
+        add_log(f"Vault import failed after {restore.stored} items: {e}", "WARNING")
+        raise HTTPException(
+            status_code=400, detail=f"{e} ({restore.stored} items imported)"
+        )
+    except BaseException:
+        await vault_io.run(restore.abort)
+        raise
+
+    add_log(f"Vault import restored {stored} items.", "INFO")
+    return {"status": "imported", "stored": stored, "failed": failed}
+
+
+@app.post("/api/vault-ops/rotate")
+async def rotate_vault_key():
+    """
+    Starts re-encrypting the vault under a new key in the background. The
+    vault stays readable and writable throughout; poll GET for progress.
+    """
+    record_activity()
+    try:
+        progress = session_manager.rotate_key(wait=False)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if progress is None:
+        raise HTTPException(status_code=400, detail="Session burned")
+    add_log(f"Vault key rotation to #{progress.key_id} started.", "INFO")
+    return {"status": "rotating", **progress.as_dict()}
+
+
+@app.get("/api/vault-ops/rotate")
+async def rotation_status():
+    progress = session_manager.rotation
+    return {
+        "key_id": session_manager.key_id,
+        "rotating": progress is not None,
+        "rotation": progress.as_dict() if progress else session_manager.last_rotation,
+    }
+
+
 @app.get("/api/vault/{name}")
 async def retrieve_secret(name: str):
     record_activity()
-    content = session_manager.retrieve_secret(name)
+    content = await vault_io.run(session_manager.retrieve_secret, name)
     if content is None:
         raise HTTPException(
             status_code=404, detail="Secret not found or session burned"
@@ -249,6 +720,66 @@ async def retrieve_secret(name: str):
     return {"name": name, "content": content}
 
 
+@app.post("/api/vault/{name}/raw")
+async def store_blob(name: str, request: Request):
+    """
+    Stores a binary item, encrypted in authenticated chunks as it arrives.
+    Takes either a raw request body or a multipart upload in field "file".
+    """
+    record_activity()
+    blob = session_manager.open_blob(name)
+    if blob is None:
+        raise HTTPException(status_code=400, detail="Session burned")
+
+    try:
+        content_type = request.headers.get("content-type", "")
+        if content_type.startswith("multipart/form-data"):
+            # Parsed as it arrives, not with request.form(), which would
+            # spool the plaintext to a temporary file outside the sandbox.
+            try:
+                upload = MultipartFileStream(content_type)
+                async for chunk in request.stream():
+                    data = upload.feed(chunk)
+                    if data:
+                        await vault_io.run(blob.write, data)
+                upload.finish()
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        else:
+            async for chunk in request.stream():
+                if chunk:
+                    await vault_io.run(blob.write, chunk)
+    except BaseException:
+        await vault_io.run(blob.abort)
+        raise
+
+    if not await vault_io.run(blob.commit):
+        raise HTTPException(status_code=500, detail="Failed to store item")
+    add_log(f"Binary item '{name}' ({blob.size} bytes) encrypted and stored.", "INFO")
+    return {"status": "stored", "size": blob.size}
+
+
+@app.get("/api/vault/{name}/raw")
+async def retrieve_blob(name: str):
+    """Streams a binary item back, decrypting one chunk at a time."""
+    record_activity()
+    chunks = await vault_io.run(session_manager.iter_blob, name)
+    if chunks is None:
+        raise HTTPException(
+            status_code=404, detail="Binary item not found or session burned"
+        )
+
+    async def body():
+        while True:
+            chunk = await vault_io.run(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+
+    add_log(f"Binary item '{name}' retrieved and decrypted.", "WARNING")
+    return StreamingResponse(body(), media_type="application/octet-stream")
+
+
 @app.post("/api/identity/generate")
 async def generate_identity(item: IdentityRequest):
     record_activity()
@@ -267,15 +798,19 @@ async def generate_identity(item: IdentityRequest):
 async def trigger_panic():
     record_activity()
     add_log("MANUAL PANIC TRIGGERED BY USER", "CRITICAL")
-    session_manager.burn_session()
+    session_manager.burn_session(wait=False)
+    events.publish("burn", {"reason": "panic"})
+    publish_status()
     return {"status": "burned"}
 
 
 @app.post("/api/regenerate")
 async def regenerate_session():
     record_activity()
-    session_manager.regenerate_session()
+    signal_sensor.reset()
+    session_manager.regenerate_session(wait=False)
     add_log("Session Regenerated manually.", "INFO")
+    publish_status()
     return {"status": "regenerated", "hash": session_manager.get_hash()}
 
 
@@ -302,12 +837,32 @@ async def generate_persona():
 
 
 @app.post("/api/tools/stegano/encode")
-async def stegano_encode(text: str = Form(...), file: UploadFile = File(...)):
+async def stegano_encode(
+    text: str = Form(...),
+    file: UploadFile = File(...),
+    bits_per_channel: int = Form(1),
+    compress: bool = Form(False),
+):
     record_activity()
     """Encodes text into an uploaded image."""
+    src_path = await run_in_threadpool(spool_upload, file.file)
     try:
-        output_image = encode_lsb(file.file, text)
-        return StreamingResponse(output_image, media_type="image/png")
+        png = await stegano_jobs.run(
+            encode_lsb_file,
+            src_path,
+            text,
+            bits_per_channel,
+            compress,
+            on_done=lambda: remove_quietly(src_path),
+        )
+        return Response(png, media_type="image/png")
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except JobTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        # Message too large for the image or bad parameters
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -316,9 +871,19 @@ async def stegano_encode(text: str = Form(...), file: UploadFile = File(...)):
 async def stegano_decode(file: UploadFile = File(...)):
     record_activity()
     """Decodes text from an uploaded image."""
+    src_path = await run_in_threadpool(spool_upload, file.file)
     try:
-        text = decode_lsb(file.file)
+        text = await stegano_jobs.run(
+            decode_lsb_file, src_path, on_done=lambda: remove_quietly(src_path)
+        )
         return {"text": text}
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except JobTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        # Hidden message too large to inflate
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
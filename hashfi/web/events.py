@@ -0,0 +1,65 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Optional, Set
+
+
+class EventBroadcaster:
+    """
+    Fans server events out to Server-Sent Events subscribers.
+
+    publish() may be called from any thread. Each event is serialised once
+    and handed to every subscriber's bounded queue on the event loop. A
+    subscriber that falls max_queue events behind has its backlog dropped
+    and receives a single "resync" event, telling the client to refetch
+    state, so a slow viewer costs bounded memory and never blocks others.
+    """
+
+    def __init__(self, max_queue: int = 100, heartbeat: float = 15.0):
+        self.max_queue = max_queue
+        self.heartbeat = heartbeat
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._next_id = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Attaches the broadcaster to the server's event loop."""
+        self._loop = loop
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: str, data: Any):
+        if self._loop is None or not self._subscribers:
+            return  # Nobody listening: publishing is free
+        payload = json.dumps(data)
+        try:
+            self._loop.call_soon_threadsafe(self._dispatch, event, payload)
+        except RuntimeError:
+            pass  # Loop already closed during shutdown
+
+    def _dispatch(self, event: str, payload: str):
+        self._next_id += 1
+        message = f"id: {self._next_id}\nevent: {event}\ndata: {payload}\n\n"
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait('event: resync\ndata: {"reason": "lagged"}\n\n')
+
+    async def stream(self, on_heartbeat=None) -> AsyncIterator[str]:
+        """Yields SSE messages for one subscriber until the client goes away."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        self._subscribers.add(queue)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    if on_heartbeat:
+                        on_heartbeat()
+                    yield ": keepalive\n\n"
+        finally:
+            self._subscribers.discard(queue)
@@ -0,0 +1,172 @@
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class JobTimeout(Exception):
+    """Raised when a job does not finish within its time budget."""
+
+
+class JobPool:
+    """
+    Runs CPU-bound jobs off the event loop in a bounded process pool.
+
+    At most max_workers jobs run at once and at most max_queue more may wait
+    for a slot; anything beyond that is rejected with JobQueueFull instead of
+    piling up. A job that exceeds timeout raises JobTimeout for its caller,
+    but keeps its slot until the worker actually finishes, so a runaway job
+    cannot push the pool past max_workers. If a worker dies, the broken pool
+    is dropped and the next job starts a fresh one.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 8, timeout: float = 30):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            try:
+                # Not fork: a forked worker would keep a copy of whatever the
+                # parent held at that moment (the vault key, the session
+                # secret, the memfd vault), out of reach of a later burn, and
+                # could inherit a lock held by one of the monitor threads.
+                # Workers do re-import the parent's main module, unless it is
+                # a package __main__ (python -m hashfi.web), so the web app
+                # keeps its side effects in the startup hook.
+                ctx = self._context()
+                self._executor = ProcessPoolExecutor(self.max_workers, mp_context=ctx)
+            except (ValueError, OSError, NotImplementedError):
+                # No POSIX semaphores (e.g. serverless): use threads.
+                self._executor = ThreadPoolExecutor(self.max_workers)
+        return self._executor
+
+    @staticmethod
+    def _context():
+        try:
+            ctx = multiprocessing.get_context("forkserver")
+        except ValueError:
+            return multiprocessing.get_context("spawn")
+        ctx.set_forkserver_preload(["hashfi.core.stegano"])
+        return ctx
+
+    def _drop_broken(self, executor: Executor):
+        if executor is not None and self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, fn, *args, on_done: Optional[Callable[[], None]] = None):
+        """
+        Runs fn(*args) in the pool. on_done is called exactly once: when the
+        worker has really finished, even if the caller already gave up on a
+        timeout, or right away if the job is rejected or never starts.
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            if on_done:
+                on_done()
+            raise JobQueueFull(f"{self._pending} jobs already queued")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        self._pending += 1
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            self._pending -= 1
+            if on_done:
+                on_done()
+            raise
+
+        executor = None
+        try:
+            executor = self._get_executor()
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(executor, fn, *args)
+        except BaseException as e:
+            if isinstance(e, BrokenProcessPool):
+                self._drop_broken(executor)
+            self._release(on_done)
+            raise
+        future.add_done_callback(lambda _: self._release(on_done))
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise JobTimeout(f"Job exceeded {self.timeout}s") from None
+        except BrokenProcessPool:
+            self._drop_broken(executor)
+            raise
+
+    def _release(self, on_done):
+        self._pending -= 1
+        self._slots.release()
+        if on_done:
+            on_done()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class IOPool:
+    """
+    Runs blocking file I/O (vault reads and writes, shredding) on a small
+    dedicated thread pool. Keeping it apart from Starlette's shared
+    threadpool means a burst of slow disk writes queues behind itself, not
+    behind (or in front of) every other sync handler.
+    """
+
+    def __init__(self, max_workers: int = 4, name: str = "io"):
+        self.max_workers = max_workers
+        self.name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def run(self, fn, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix=self.name
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def spool_upload(upload_file, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Copies an uploaded file to a named temp file in chunks and returns its
+    path, so workers can open it without the whole body sitting in memory.
+    """
+    fd, path = tempfile.mkstemp(prefix="hashfi_upload_")
+    with os.fdopen(fd, "wb") as dst:
+        upload_file.seek(0)
+        shutil.copyfileobj(upload_file, dst, chunk_size)
+    return path
+
+
+def remove_quietly(*paths: str):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
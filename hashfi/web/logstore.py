@@ -0,0 +1,56 @@
+import threading
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import List, Optional
+
+
+class LogStore:
+    """
+    Bounded, thread-safe log with a monotonically increasing sequence id.
+
+    Entries live in a deque, so trimming the oldest is O(1), and reads with
+    `since` only touch the entries newer than that sequence id.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self._entries = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._entries.maxlen
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def append(self, message: str, level: str = "INFO") -> dict:
+        with self._lock:
+            self._seq += 1
+            entry = {
+                "seq": self._seq,
+                "time": datetime.now().strftime("%H:%M:%S"),
+                "level": level,
+                "message": message,
+            }
+            self._entries.append(entry)
+        return entry
+
+    def since(
+        self, seq: Optional[int] = None, limit: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Entries with a sequence id greater than seq, oldest first. Without seq,
+        the most recent entries. limit caps the result to the newest N.
+        """
+        with self._lock:
+            newer = len(self._entries) if seq is None else self._seq - seq
+            count = max(0, min(newer, len(self._entries)))
+            if limit is not None:
+                count = min(count, limit)
+            # Walk back from the newest entry; never touches older ones.
+            entries = list(islice(reversed(self._entries), count))
+        entries.reverse()
+        return entries
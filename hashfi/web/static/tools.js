@@ -122,27 +122,53 @@ async function decryptReceivedMessage() {
 }
 
 // --- Vault Export/Import ---
+// With a passphrase the server streams the vault as an encrypted archive;
+// with the messaging key the vault is encrypted here in the browser.
+async function exportVaultArchive() {
+    const passphrase = prompt('Enter passphrase to encrypt vault:');
+    if (!passphrase) return;
+    const res = await fetch('/api/vault-ops/export', {
+        headers: {'X-Vault-Passphrase': passphrase}
+    });
+    if (!res.ok) return alert('Vault export failed.');
+    const a = document.createElement('a');
+    a.href = URL.createObjectURL(await res.blob());
+    a.download = 'hashfi_vault.hfx';
+    document.body.appendChild(a);
+    a.click();
+    a.remove();
+}
+
+async function importVaultArchive(file) {
+    const passphrase = prompt('Enter passphrase to decrypt vault:');
+    if (!passphrase) return;
+    const res = await fetch('/api/vault-ops/import', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/octet-stream',
+            'X-Vault-Passphrase': passphrase
+        },
+        body: file
+    });
+    const data = await res.json();
+    if (!res.ok) return alert(`Vault import failed: ${data.detail}`);
+    alert(`Vault imported: ${data.stored} items.`);
+    loadSecrets();
+}
+
 async function exportVault() {
-    // Fetch secrets from backend
-    const response = await fetch('/api/vault');
-    const data = await response.json();
-    const secrets = data.secrets || [];
-    const vault = {};
-    for (const name of secrets) {
-        const res = await fetch(`/api/vault/${encodeURIComponent(name)}`);
-        if (res.ok) {
-            const d = await res.json();
-            vault[name] = d.content;
-        }
+    if (!document.getElementById('vaultUseMsgKey')?.checked) {
+        return exportVaultArchive();
     }
-    let key;
-    if (document.getElementById('vaultUseMsgKey')?.checked) {
-        key = await getMsgKey();
-    } else {
-        const password = prompt('Enter password to encrypt vault:');
-        if (!password) return;
-        key = await deriveKey(password);
+    // One NDJSON request for the whole vault
+    const response = await fetch('/api/vault-ops/batch');
+    const vault = {};
+    for (const line of (await response.text()).split('\n')) {
+        if (!line) continue;
+        const secret = JSON.parse(line);
+        if (secret.content !== null) vault[secret.name] = secret.content;
     }
+    const key = await getMsgKey();
     const iv = window.crypto.getRandomValues(new Uint8Array(12));
     const enc = new TextEncoder();
     const ciphertext = await window.crypto.subtle.encrypt(
@@ -161,6 +187,9 @@ async function exportVault() {
 async function importVaultFile(event) {
     const file = event.target.files[0];
     if (!file) return;
+    if (await file.slice(0, 4).text() === 'HFVX') {
+        return importVaultArchive(file);
+    }
     const payload = await file.text();
     if (!payload.includes(':')) return alert('Invalid vault file');
     let key;
@@ -174,24 +203,28 @@ async function importVaultFile(event) {
     const [ivB64, ctB64] = payload.split(':');
     const iv = b642buf(ivB64);
     const ct = b642buf(ctB64);
+    let vault;
     try {
         const pt = await window.crypto.subtle.decrypt(
             {name: 'AES-GCM', iv: new Uint8Array(iv)}, key, ct
         );
-        const vault = JSON.parse(new TextDecoder().decode(pt));
-        // Restore secrets to backend
-        for (const [name, content] of Object.entries(vault)) {
-            await fetch('/api/vault', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({name, content})
-            });
-        }
-        alert('Vault imported!');
-        loadSecrets();
+        vault = JSON.parse(new TextDecoder().decode(pt));
     } catch (e) {
-        alert('Decryption failed! Wrong password or corrupted file.');
+        return alert('Decryption failed! Wrong password or corrupted file.');
     }
+    // Restore secrets to backend: one NDJSON request for the whole vault
+    const body = Object.entries(vault)
+        .map(([name, content]) => JSON.stringify({name, content}))
+        .join('\n');
+    const res = await fetch('/api/vault-ops/batch', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/x-ndjson'},
+        body
+    });
+    const data = await res.json();
+    if (!res.ok) return alert(`Vault import failed: ${data.detail}`);
+    alert(`Vault imported: ${data.stored} secrets.`);
+    loadSecrets();
 }
 async function spreadTheWord() {
     const resultDiv = document.getElementById('spreadResult');
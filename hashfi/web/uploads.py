@@ -0,0 +1,91 @@
+from typing import List
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart before 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+
+class MultipartFileStream:
+    """
+    Pulls one field out of a multipart/form-data body as it arrives.
+
+    feed() takes the raw body in any pieces and returns the bytes of the
+    wanted field found in them; every other field is skipped unread. Unlike
+    Starlette's form parser nothing is buffered or spooled to a temporary
+    file, so the data can be encrypted before it touches the disk. Raises
+    ValueError for a malformed body or, from finish(), a truncated body
+    or a missing field.
+    """
+
+    def __init__(self, content_type: str, field: str = "file"):
+        _, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise ValueError("Missing multipart boundary")
+        self.field = field
+        self.found = False
+        self._ended = False
+        self._in_field = False
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._data: List[bytes] = []
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_end": self._on_end,
+            },
+        )
+
+    def feed(self, chunk: bytes) -> bytes:
+        self._parser.write(chunk)
+        data, self._data = b"".join(self._data), []
+        return data
+
+    def finish(self):
+        self._parser.finalize()
+        if not self._ended:
+            raise ValueError("Multipart body is truncated")
+        if not self.found:
+            raise ValueError(f"Missing {self.field} field")
+
+    def _on_part_begin(self):
+        self._disposition = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        # Only the first part with the field's name is taken.
+        self._in_field = not self.found and options.get(b"name") == (
+            self.field.encode()
+        )
+        self.found = self.found or self._in_field
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_field:
+            self._data.append(data[start:end])
+
+    def _on_part_end(self):
+        self._in_field = False
+
+    def _on_end(self):
+        self._ended = True
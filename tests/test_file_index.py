@@ -0,0 +1,21 @@
+from hashfi.core.file_index import IndexEntry, rollup
+from hashfi.sensors.file_sensor import FileIntegritySensor
+
+
+def test_rollup_accepts_root_with_trailing_slash(tmp_path):
+    root = str(tmp_path)
+    entries = {f"{root}/sub/a": IndexEntry(1, 1, 1, "digest")}
+    assert rollup(entries, root + "/") == rollup(entries, root)
+
+
+def test_sensor_with_trailing_slash_detects_changes(tmp_path):
+    tree = tmp_path / "tree"
+    (tree / "sub").mkdir(parents=True)
+    (tree / "sub" / "a").write_text("one")
+    index = str(tmp_path / "index.db")
+
+    sensor = FileIntegritySensor(f"{tree}/", use_inotify=False, index_path=index)
+    assert not sensor.changes
+    (tree / "sub" / "a").write_text("two")
+    sensor = FileIntegritySensor(f"{tree}/", use_inotify=False, index_path=index)
+    assert sensor.changes == {str(tree / "sub" / "a")}
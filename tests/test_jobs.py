@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(args, cwd):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip().splitlines()[-1]
+
+
+def test_importing_web_app_starts_nothing(tmp_path):
+    # Workers re-import the launching module; importing the app must not
+    # start threads or sensors.
+    code = "import threading, hashfi.web.app; print(threading.active_count())"
+    assert run_python(["-c", code], tmp_path) == "1"
+
+
+def test_stegano_worker_does_not_import_web_app(tmp_path):
+    # Launched like `python -m hashfi.web`: a package __main__ that imports
+    # the app and submits a job to its stegano pool.
+    probe = tmp_path / "probe"
+    probe.mkdir()
+    (probe / "__init__.py").write_text("")
+    (probe / "jobs.py").write_text(textwrap.dedent("""
+            import os
+            import sys
+
+            def report():
+                return os.getpid(), "hashfi.web.app" in sys.modules
+            """))
+    (probe / "__main__.py").write_text(textwrap.dedent("""
+            import asyncio
+            import os
+
+            from hashfi.web.app import stegano_jobs
+            from probe.jobs import report
+
+            pid, imported = asyncio.run(stegano_jobs.run(report))
+            stegano_jobs.shutdown()
+            print(pid != os.getpid(), imported)
+            """))
+    assert run_python(["-m", "probe"], tmp_path) == "True False"